@@ -0,0 +1,192 @@
+# run.py - offline benchmarks against the stub site: python benchmarks/run.py [--compare results/old.json]
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import threading
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / 'results'
+sys.path.insert(0, str(REPO_DIR))
+
+from benchmarks.stub_site.server import StubSite
+
+logger = logging.getLogger("benchmarks")
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {'runs': len(ordered), 'mean': round(statistics.fmean(ordered), 4), 'median': round(statistics.median(ordered), 4),
+            'p90': round(ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))], 4),
+            'min': round(ordered[0], 4), 'max': round(ordered[-1], 4)}
+
+def timed_runs(iterations, func, setup=None):
+    samples = []
+    for i in range(iterations):
+        if setup: setup(i)
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def expect(result, kind="initial_data"):
+    if not result or result.get('type') != kind: raise RuntimeError(f"Expected {kind}, got {result!r:.200}")
+    return result
+
+class Downloads:
+    # Collects completion events from the scraper's progress callback
+    def __init__(self):
+        self.done = {}
+        self.cond = threading.Condition()
+
+    def progress(self, did, prog, status, info=None):
+        if status not in ('completed', 'failed'): return
+        with self.cond:
+            self.done[did] = status
+            self.cond.notify_all()
+
+    def wait(self, dids, timeout):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while not all(did in self.done for did in dids):
+                if not self.cond.wait(max(0, deadline - time.monotonic())): break
+            return {did: self.done.get(did, 'timeout') for did in dids}
+
+def run(args, site):
+    import scraper_logic
+    from scraper_logic import Scraper, initial_login
+    from metrics import metrics
+
+    if args.chromedriver: scraper_logic._resolved_driver['path'] = args.chromedriver
+    scraper_logic.PREFETCH_PAGES = args.prefetch_pages
+    results = {}
+    scraper = None
+    try:
+        start = time.perf_counter()
+        driver = initial_login(lambda msg: logger.info(msg), headless=True)
+        if not driver: raise RuntimeError("Login against the stub site failed")
+        results['login'] = summarize([time.perf_counter() - start])
+
+        downloads = Downloads()
+        scraper = Scraper(driver, status_callback=lambda msg: logger.debug(msg), download_progress_callback=downloads.progress)
+        # Every run must hit the browser, not the SQLite cache
+        if scraper.result_cache: scraper.result_cache.close()
+        scraper.result_cache = None
+
+        results['search'] = timed_runs(args.iterations, lambda i: expect(scraper.perform_search(f"בדיקה {i}")))
+        results['filter_expansion'] = timed_runs(args.iterations, lambda i: scraper.expand_and_get_all_filters(),
+                                                 setup=lambda i: expect(scraper.perform_search(f"מסננים {i}")))
+
+        def first_filter(i):
+            expect(scraper.perform_search(f"החלה {i}"))
+            filters = scraper.expand_and_get_all_filters()
+            state['filter'] = next(f['text'] for f in filters if f['level'] == 0)
+        state = {}
+        results['filter_apply'] = timed_runs(args.iterations, lambda i: expect(scraper.apply_filter_by_name(state['filter'])), setup=first_filter)
+
+        def several_filters(i):
+            expect(scraper.perform_search(f"כמה מסננים {i}"))
+            state['filters'] = [f['text'] for f in scraper.expand_and_get_all_filters() if f['level'] == 0][:args.batch_filters]
+        results['filter_apply_batch'] = timed_runs(args.iterations, lambda i: expect(scraper.apply_filters(state['filters'])), setup=several_filters)
+
+        samples = []
+        for i in range(args.iterations):
+            expect(scraper.perform_search(f"עמודים {i}"))
+            for _ in range(args.pages - 1):
+                time.sleep(args.think_ms / 1000)  # the user reading the page, which is when prefetching happens
+                start = time.perf_counter()
+                expect(scraper.navigate_to_next_page())
+                samples.append(time.perf_counter() - start)
+        results['pagination'] = summarize(samples)
+
+        library = tempfile.mkdtemp(prefix="bench-library-")
+        scraper.set_final_download_path(library)
+        scraper.download_pool_ready.wait(120)
+        shiurim = []
+        while len(shiurim) < args.downloads:
+            page = expect(scraper.perform_search(f"הורדות {len(shiurim)}"))
+            shiurim += page['data']['shiurim']
+        dids = [f"bench-{i}" for i in range(args.downloads)]
+        start = time.perf_counter()
+        for did, shiur in zip(dids, shiurim):
+            scraper.queue_download(shiur, did)
+        outcome = downloads.wait(dids, args.download_timeout)
+        seconds = time.perf_counter() - start
+        completed = sum(1 for status in outcome.values() if status == 'completed')
+        stored = sum(p.stat().st_size for p in Path(library).rglob('*') if p.is_file())
+        results['downloads'] = {'files': args.downloads, 'completed': completed, 'seconds': round(seconds, 3),
+                                'files_per_second': round(completed / seconds, 3), 'bytes': stored,
+                                'bytes_per_second': round(stored / seconds), 'served_bytes': site.bytes_served}
+    finally:
+        if scraper: scraper.close_driver()
+        site.stop()
+    return {'meta': meta(args), 'results': results, 'metrics': metrics.snapshot()}
+
+def meta(args):
+    try: rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError: rev = None
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'git_rev': rev, 'python': sys.version.split()[0],
+            'params': {k: v for k, v in vars(args).items() if k not in ('compare', 'output', 'chromedriver')}}
+
+def compare(current, baseline):
+    # Percent change of each timing against the baseline; negative is faster
+    print(f"{'benchmark':<20}{'metric':<18}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, stats in current['results'].items():
+        old = baseline.get('results', {}).get(name, {})
+        for metric, value in stats.items():
+            if metric in ('runs', 'files', 'completed') or not isinstance(old.get(metric), (int, float)): continue
+            change = f"{(value - old[metric]) / old[metric] * 100:+.1f}%" if old[metric] else "n/a"
+            print(f"{name:<20}{metric:<18}{old[metric]:>12}{value:>12}{change:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local stand-in of the site")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency-ms", type=int, default=50, help="delay the stub adds to every interaction")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--filter-groups", type=int, default=4)
+    parser.add_argument("--filters-per-group", type=int, default=40)
+    parser.add_argument("--batch-filters", type=int, default=5, help="filters applied together in filter_apply_batch")
+    parser.add_argument("--think-ms", type=int, default=500, help="pause on each results page before paging on")
+    parser.add_argument("--prefetch-pages", type=int, default=1, help="results pages prefetched ahead (0 disables)")
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--file-size-kb", type=int, default=2048)
+    parser.add_argument("--download-timeout", type=float, default=300)
+    parser.add_argument("--chromedriver", help="path to chromedriver, skipping driver resolution")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    # Paths on the command line are relative to where the benchmark was started, not to the throwaway home below
+    for name in ('chromedriver', 'output', 'compare'):
+        if getattr(args, name): setattr(args, name, os.path.abspath(getattr(args, name)))
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+
+    site = StubSite(latency_ms=args.latency_ms, page_size=args.page_size, pages=args.pages, filter_groups=args.filter_groups,
+                    filters_per_group=args.filters_per_group, file_size=args.file_size_kb * 1024).start()
+    # The scraper keeps its profile, caches, journal and config.ini under HOME and the working directory;
+    # throwaway ones keep runs independent of each other and of the real app. All of this must happen
+    # before scraper_logic is imported.
+    home = tempfile.mkdtemp(prefix="bench-home-")
+    os.environ['HOME'] = os.environ['USERPROFILE'] = home
+    os.environ['KOL_HEADLESS'] = "1"
+    os.environ['KOL_SITE_URL'] = site.url
+    os.chdir(home)
+
+    report = run(args, site)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(json.dumps(report['results'], ensure_ascii=False, indent=2))
+    logger.info(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f: compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+// app.js - a stand-in for the site's single-page app. It renders only the DOM contracts scraper_logic
+// relies on, with window.STUB.latency ms between an interaction and the DOM update, like an XHR would.
+(function () {
+    const C = window.STUB;
+    const root = document.getElementById('app');
+    const later = (fn, ms) => setTimeout(fn, ms === undefined ? C.latency : ms);
+    const el = (tag, cls, text) => {
+        const e = document.createElement(tag);
+        if (cls) e.className = cls;
+        if (text !== undefined) e.textContent = text;
+        return e;
+    };
+    const hash = s => { let h = 0; for (const ch of s) h = (h * 31 + ch.charCodeAt(0)) | 0; return Math.abs(h); };
+    let view = null;
+
+    function banner() {
+        const b = el('div', 'banner-search');
+        b.appendChild(el('input'));
+        return b;
+    }
+
+    function renderLogin(target) {
+        root.innerHTML = '';
+        const code = el('input'); code.setAttribute('formcontrolname', 'code');
+        const password = el('input'); password.setAttribute('formcontrolname', 'password'); password.type = 'password';
+        password.addEventListener('keydown', e => {
+            if (e.key !== 'Enter') return;
+            later(() => {
+                localStorage.setItem('stub-token', code.value || 'token');
+                document.cookie = 'stub-session=1; path=/';
+                location.hash = '#' + decodeURIComponent(target || '/regularSite/new');
+            });
+        });
+        root.append(code, password);
+    }
+
+    // --- Filters: headers open their group, "הצג עוד" renders more options, arrows render nested ones ---
+    function checkbox(title, count) {
+        const cb = el('mat-checkbox', 'mat-checkbox filter-option');
+        const label = el('label');
+        const input = el('input'); input.type = 'checkbox';
+        input.addEventListener('click', () => {
+            const key = `${title} ${count}`;
+            if (view.filters.has(key)) view.filters.delete(key); else view.filters.add(key);
+            view.page = 0;
+            later(renderShiurim);
+        });
+        label.append(input, el('span', 'filter-title', title), el('span', 'shiurim-count', count));
+        cb.appendChild(label);
+        return cb;
+    }
+
+    function filterItem(g, i) {
+        const title = `מסנן ${g + 1}-${i + 1}`, count = `(${(i * 7 + g) % 90 + 1})`;
+        if (i % 5 !== 4) return checkbox(title, count);
+        const nested = el('div', 'nested-filter-container');
+        const head = el('div', 'nested-flex-display');
+        head.append(el('span', 'filter-title', title), el('span', 'shiurim-count', count));
+        const arrow = el('span', 'icon-nav-arrow', '›');
+        arrow.addEventListener('click', () => later(() => {
+            if (nested.classList.contains('expanded-nested-filter-container')) return;
+            nested.classList.add('expanded-nested-filter-container');
+            for (let k = 0; k < C.nestedPerFilter; k++) nested.appendChild(checkbox(`${title}.${k + 1}`, `(${k + 2})`));
+        }, C.latency / 2));
+        head.appendChild(arrow);
+        nested.appendChild(head);
+        return nested;
+    }
+
+    function renderGroup(group, g) {
+        const content = group.querySelector('.scroll-container');
+        content.innerHTML = '';
+        for (let i = 0; i < Math.min(group.shown, C.filtersPerGroup); i++) content.appendChild(filterItem(g, i));
+        if (group.shown < C.filtersPerGroup) {
+            const more = el('div', 'display-more', 'הצג עוד');
+            more.addEventListener('click', () => later(() => { group.shown += C.showMoreChunk; renderGroup(group, g); }, C.latency / 2));
+            content.appendChild(more);
+        }
+    }
+
+    function renderFilters(host) {
+        host.innerHTML = '';
+        for (let g = 0; g < C.filterGroups; g++) {
+            const group = el('app-filter-container');
+            group.shown = C.showMoreChunk;
+            const header = el('div', 'filter-header', `קבוצה ${g + 1}`);
+            const container = el('div', 'filter-container');
+            const content = el('div', 'filter-content');
+            content.appendChild(el('div', 'scroll-container'));
+            container.appendChild(content);
+            header.addEventListener('click', () => {
+                container.classList.toggle('opened');
+                if (container.classList.contains('opened') && !content.firstChild.firstChild) later(() => renderGroup(group, g), C.latency / 2);
+            });
+            group.append(header, container);
+            host.appendChild(group);
+        }
+    }
+
+    // --- Results and pagination ---
+    function shiur(fileId, n) {
+        const c = el('div', 'shiur-container');
+        c.append(el('div', 'shiurim-title', `${view.title} - שיעור ${n}`), el('div', 'shiurim-rav-name', `הרב ${view.title}`),
+                 el('div', 'shiurim-start-time', `${String(n % 28 + 1).padStart(2, '0')}/01/2024`),
+                 el('span', 'shiur-duration', `${n % 60 + 10}:${String(n % 60).padStart(2, '0')}`));
+        c.appendChild(el('button', 'click-phone-button', String(fileId)));
+        const download = el('button', 'download-button');
+        const icon = el('svg-icon'); icon.setAttribute('src', 'assets/icons/download-i.svg');
+        download.appendChild(icon);
+        download.addEventListener('click', () => later(() => {
+            const option = el('div', 'download-option', 'MP3');
+            option.addEventListener('click', () => {
+                option.remove();
+                const a = el('a'); a.href = `/media/${fileId}.mp3`; a.download = '';
+                a.click();
+            });
+            document.body.appendChild(option);
+        }, C.latency / 2));
+        c.appendChild(download);
+        return c;
+    }
+
+    function renderShiurim() {
+        const display = document.querySelector('app-shiurim-display');
+        if (!display) return;
+        display.innerHTML = '';
+        const base = 100000 + (hash(view.title + [...view.filters].sort().join('|')) % 800000);
+        for (let i = 0; i < C.pageSize; i++) {
+            const n = view.page * C.pageSize + i;
+            display.appendChild(shiur(base + n, n + 1));
+        }
+        const pager = document.querySelector('app-pagination-options');
+        pager.innerHTML = '';
+        const prev = el('span', 'prev' + (view.page === 0 ? ' disabled' : ''), '<');
+        const next = el('span', 'next' + (view.page >= C.pages - 1 ? ' disabled' : ''), '>');
+        prev.addEventListener('click', () => { if (view.page > 0) { view.page--; later(renderShiurim); } });
+        next.addEventListener('click', () => { if (view.page < C.pages - 1) { view.page++; later(renderShiurim); } });
+        pager.append(prev, el('span', 'active', String(view.page + 1)), next);
+    }
+
+    function renderResults(title) {
+        root.innerHTML = '';
+        root.appendChild(banner());
+        view = { title: title, filters: new Set(), page: 0 };
+        later(() => {
+            const filters = el('div', 'filters');
+            renderFilters(filters);
+            root.append(filters, el('app-shiurim-display'), el('app-pagination-options'));
+            renderShiurim();
+        });
+    }
+
+    function renderRavs(query) {
+        root.innerHTML = '';
+        root.appendChild(banner());
+        later(() => {
+            for (let i = 0; i < C.ravs; i++) {
+                const c = el('div', 'rav-container');
+                const name = el('a', 'rav-name', `${query} ${i + 1}`);
+                name.href = `#/regularSite/ravs/${1000 + i}/1/1`;
+                c.append(name, el('span', 'rav-shiurim-sum', `(${(i + 1) * 13})`));
+                root.appendChild(c);
+            }
+        });
+    }
+
+    function route() {
+        const path = (location.hash || '#/').slice(1);
+        const parts = path.split('/').filter(Boolean);
+        if (parts[0] === 'login') return renderLogin(parts[1]);
+        if (!localStorage.getItem('stub-token')) { location.hash = '#/login/%2FregularSite%2Fnew'; return; }
+        const rest = parts.slice(2).map(decodeURIComponent).join('/');
+        if (parts[1] === 'searchResults') return renderResults(rest);
+        if (parts[1] === 'ravSearch') return renderRavs(rest);
+        if (parts[1] === 'ravs') return renderResults(`רב ${parts[2]}`);
+        root.innerHTML = '';
+        root.appendChild(banner());
+    }
+
+    window.addEventListener('hashchange', route);
+    route();
+})();
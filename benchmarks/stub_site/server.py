@@ -0,0 +1,121 @@
+# server.py - local HTTP stand-in for the site, used by the benchmarks
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent
+INDEX_HTML = """<!DOCTYPE html>
+<html dir="rtl"><head><meta charset="utf-8"><title>stub</title>
+<style>.filter-container { display: none; } .filter-container.opened { display: block; }
+.nested-filter-container > mat-checkbox { margin-right: 1em; display: block; } mat-checkbox { display: block; }</style>
+</head><body><div id="app"></div>
+<script>window.STUB = %s;</script><script src="/app.js"></script></body></html>"""
+MEDIA_RE = re.compile(r'^/media/(\d+)\.mp3$')
+STREAM_CHUNK = 256 * 1024
+
+class StubSite:
+    # Serves the stub app and /media/<file_id>.mp3 files. Sizes differ slightly per file_id (and so does the
+    # content), so same-size content checks in the library behave as they would with real shiurim.
+    def __init__(self, port=0, latency_ms=50, page_size=20, pages=5, ravs=5, filter_groups=4,
+                 filters_per_group=40, show_more_chunk=10, nested_per_filter=3, file_size=2 * 1024 * 1024):
+        self.config = {'latency': latency_ms, 'pageSize': page_size, 'pages': pages, 'ravs': ravs,
+                       'filterGroups': filter_groups, 'filtersPerGroup': filters_per_group,
+                       'showMoreChunk': show_more_chunk, 'nestedPerFilter': nested_per_filter}
+        self.file_size = file_size
+        self.bytes_served = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def media_size(self, file_id):
+        return self.file_size + int(file_id) % 4096
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="stub-site")
+        self.thread.start()
+        logger.info(f"Stub site listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        site = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):
+                logger.debug(fmt % args)
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path in ('/', '/index.html'):
+                    self._send(200, (INDEX_HTML % json.dumps(site.config)).encode('utf-8'), 'text/html; charset=utf-8')
+                elif path == '/app.js':
+                    self._send(200, (STATIC_DIR / 'app.js').read_bytes(), 'application/javascript; charset=utf-8')
+                elif m := MEDIA_RE.match(path):
+                    self._media(m.group(1))
+                else:
+                    self._send(404, b'not found', 'text/plain')
+
+            def _media(self, file_id):
+                size = site.media_size(file_id)
+                start = 0
+                if m := re.match(r'bytes=(\d+)-', self.headers.get('Range', '')):
+                    start = int(m.group(1))
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{size - 1}/{size}')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Content-Disposition', f'attachment; filename="{file_id}.mp3"')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(size - start))
+                self.end_headers()
+                pattern = (file_id.encode() + b'-') * (STREAM_CHUNK // (len(file_id) + 1) + 1)
+                sent = start
+                while sent < size:
+                    offset = sent % (len(file_id) + 1)
+                    chunk = pattern[offset:offset + min(STREAM_CHUNK, size - sent)]
+                    self.wfile.write(chunk)
+                    sent += len(chunk)
+                with site.lock: site.bytes_served += size - start
+
+        return Handler
+
+if __name__ == "__main__":
+    import argparse, time
+    parser = argparse.ArgumentParser(description="Serve the stub site until interrupted")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    site = StubSite(port=args.port, latency_ms=args.latency_ms).start()
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,159 @@
+# cli.py - headless batch runner: python cli.py --query "..." --topic "בראשית" --jobs jobs.jsonl
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+
+import scraper_logic
+from scraper_logic import Scraper, initial_login
+from harvester import Harvester, HarvestWriter
+from shiur_index import ShiurIndex, search_local
+from topics_catalog import TopicCatalog
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK, EXIT_FAILURES, EXIT_USAGE, EXIT_LOGIN_FAILED, EXIT_INTERRUPTED = 0, 1, 2, 3, 130
+_emit_lock = threading.Lock()
+
+def emit(event, **fields):
+    with _emit_lock:
+        sys.stdout.write(json.dumps(dict(event=event, time=round(time.time(), 3), **fields), ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+def load_jobs(args, catalog):
+    jobs = [{'query': q} for q in args.query] + [{'topic': t} for t in args.topic] + [{'local': q} for q in args.local]
+    if args.jobs:
+        with open(args.jobs, 'r', encoding='utf-8') as f:
+            jobs += [json.loads(line) for line in f if line.strip() and not line.lstrip().startswith('#')]
+    for job in jobs:
+        if 'topic' in job:
+            job['href'] = catalog.find(job['topic'])
+            if not job['href']:
+                suggestions = ", ".join(f"{main_cat}/{name}" for main_cat, name, _ in catalog.search(job['topic'], 3))
+                raise ValueError(f"Unknown topic: {job['topic']}" + (f" (did you mean: {suggestions})" if suggestions else ""))
+        if not job.get('query') and not job.get('href') and not job.get('local'): raise ValueError(f"Job needs query, topic, href or local: {job}")
+    return jobs
+
+class DownloadTracker:
+    def __init__(self):
+        self.states = {}
+        self.cond = threading.Condition()
+
+    def __call__(self, did, prog, stat, info=None):
+        with self.cond:
+            self.states[did] = stat
+            self.cond.notify_all()
+        if stat in ("completed", "failed"): emit("download", did=did, status=stat)
+        elif stat == "downloading" and info: emit("progress", did=did, **info)
+        elif stat == "retrying" and info: emit("retry", did=did, **info)
+
+    def wait(self, timeout):
+        with self.cond:
+            return self.cond.wait_for(lambda: all(s in ("completed", "failed") for s in self.states.values()), timeout)
+
+    def failed(self):
+        return [did for did, s in self.states.items() if s != "completed"]
+
+def run_job(scraper, job, args):
+    source = job.get('query') or job.get('topic') or job['href']
+    fmt = job.get('format', args.format)
+    output = job.get('output') or os.path.join(args.output_dir, re.sub(r'[<>:"/\\|?*]', '_', source) + f".{fmt}")
+    harvester = Harvester(scraper, lambda page, count: emit("page", job=source, page=page, shiurim=count))
+    emit("job_start", job=source, output=output)
+    count = harvester.harvest(output, query=job.get('query'), href=job.get('href'), fmt=fmt,
+                              download=job.get('download', args.download), max_pages=job.get('max_pages', args.max_pages),
+                              filters=job.get('filters', args.filter))
+    emit("job_done", job=source, output=output, shiurim=count)
+    return count
+
+def run_local_job(index, scraper, job, args):
+    # Answered from the shiur index; the browser is only needed when the hits are downloaded
+    source = job['local']
+    fmt = job.get('format', args.format)
+    output = job.get('output') or os.path.join(args.output_dir, "local_" + re.sub(r'[<>:"/\\|?*]', '_', source) + f".{fmt}")
+    emit("job_start", job=source, output=output)
+    result = search_local(index, source, job.get('limit', args.local_limit))
+    if result['type'] == 'error': raise RuntimeError(result['message'])
+    writer, count = HarvestWriter(output, fmt), 0
+    try:
+        for hit in result['data']['shiurim']:
+            if not writer.write(dict(hit, source=source)): continue
+            count += 1
+            if scraper and job.get('download', args.download):
+                scraper.queue_download(hit, f"{hit['id']}_{int(time.time())}", hit.get('state'))
+    finally:
+        writer.close()
+    emit("job_done", job=source, output=output, shiurim=count)
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kol Halashon batch runner (no GUI). Progress is printed as JSON lines.")
+    parser.add_argument("--query", action="append", default=[], help="search query (repeatable)")
+    parser.add_argument("--topic", action="append", default=[], help="topic name from topics.json, optionally 'main/sub' (repeatable)")
+    parser.add_argument("--local", action="append", default=[], help="search the local shiur index instead of the site (repeatable)")
+    parser.add_argument("--local-limit", type=int, default=100, help="hits kept per local search")
+    parser.add_argument("--jobs", help="JSON-lines file of jobs: {\"query\"|\"topic\"|\"href\"|\"local\": ..., \"filters\", \"download\", \"max_pages\", \"output\", \"format\"}")
+    parser.add_argument("--filter", action="append", default=[], help="filter label to apply to every job, as shown in the app (repeatable)")
+    parser.add_argument("--output-dir", default=".", help="where listings are written")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--download", action="store_true", help="queue every harvested shiur for download")
+    parser.add_argument("--download-dir", help="download destination (default: home folder)")
+    parser.add_argument("--download-timeout", type=float, default=6 * 3600, help="seconds to wait for queued downloads")
+    parser.add_argument("--max-pages", type=int, help="stop each job after this many pages")
+    parser.add_argument("--sessions", type=int, help="number of headless download sessions")
+    parser.add_argument("--show-browser", action="store_true", help="run Chrome with a window")
+    parser.add_argument("--metrics", help="write timing metrics here on exit (.prom/.txt for Prometheus text, JSON otherwise)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+    catalog = TopicCatalog.load()
+    try:
+        jobs = load_jobs(args, catalog)
+    except (ValueError, OSError, json.JSONDecodeError) as e:
+        emit("error", message=str(e)); return EXIT_USAGE
+    if not jobs:
+        parser.print_usage(sys.stderr); return EXIT_USAGE
+    if args.sessions is not None: scraper_logic.DOWNLOAD_SESSIONS = args.sessions
+    if args.metrics: scraper_logic.METRICS_FILE = args.metrics
+    os.makedirs(args.output_dir, exist_ok=True)
+    if all('local' in job and not job.get('download', args.download) for job in jobs):
+        index = ShiurIndex()
+        try:
+            for job in jobs: run_local_job(index, None, job, args)
+        finally:
+            index.close()
+        emit("summary", jobs=len(jobs), failed_jobs=0, downloads=0, failed_downloads=0)
+        return EXIT_OK
+
+    driver = initial_login(lambda msg: emit("status", message=msg), headless=not args.show_browser)
+    if not driver:
+        emit("error", message="login failed"); return EXIT_LOGIN_FAILED
+    tracker = DownloadTracker()
+    scraper = Scraper(driver, lambda msg: emit("status", message=msg), tracker)
+    failed_jobs = []
+    try:
+        if args.download_dir: scraper.set_final_download_path(args.download_dir)
+        for job in jobs:
+            try:
+                if 'local' in job: run_local_job(scraper.shiur_index, scraper, job, args)
+                else: run_job(scraper, job, args)
+            except Exception as e:
+                logger.error(f"Job failed: {job}: {e}", exc_info=True)
+                emit("job_failed", job=job, message=str(e)); failed_jobs.append(job)
+        if tracker.states:
+            emit("status", message=f"waiting for {len(tracker.states)} downloads")
+            if not tracker.wait(args.download_timeout): emit("error", message="timed out waiting for downloads")
+    except KeyboardInterrupt:
+        emit("error", message="interrupted"); return EXIT_INTERRUPTED
+    finally:
+        scraper.close_driver()
+    failed_downloads = tracker.failed()
+    emit("summary", jobs=len(jobs), failed_jobs=len(failed_jobs), downloads=len(tracker.states), failed_downloads=len(failed_downloads))
+    return EXIT_FAILURES if failed_jobs or failed_downloads else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# download_journal.py
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = Path.home() / '.kol_halashon' / 'downloads.sqlite3'
+
+class DownloadJournal:
+    # Append-only log of download events keyed by the site's file_id. The latest event per file_id
+    # is its state: 'queued' (unfinished if the app died), 'completed' or 'failed'.
+    def __init__(self, path=JOURNAL_FILE):
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, file_id TEXT NOT NULL, event TEXT NOT NULL, payload TEXT, at REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_file ON events(file_id, seq)")
+        self.conn.commit()
+        self.latest = {}
+        rows = self.conn.execute("""SELECT file_id, event, payload FROM events
+            WHERE seq IN (SELECT MAX(seq) FROM events GROUP BY file_id)""").fetchall()
+        for file_id, event, payload in rows:
+            self.latest[file_id] = (event, json.loads(payload) if payload else {})
+        self._compact()
+        # file_ids queued by this process; anything else still 'queued' was interrupted
+        self.in_flight = set()
+
+    def _compact(self):
+        total = self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        if total > 2 * len(self.latest) + 1000:
+            self.conn.execute("DELETE FROM events WHERE seq NOT IN (SELECT MAX(seq) FROM events GROUP BY file_id)")
+            self.conn.commit()
+            logger.info(f"Compacted download journal from {total} to {len(self.latest)} events.")
+
+    def _append(self, file_id, event, payload=None):
+        self.conn.execute("INSERT INTO events (file_id, event, payload, at) VALUES (?, ?, ?, ?)",
+                          (file_id, event, json.dumps(payload, ensure_ascii=False) if payload else None, time.time()))
+        self.conn.commit()
+        self.latest[file_id] = (event, payload or {})
+
+    def state(self, file_id):
+        with self.lock:
+            entry = self.latest.get(file_id)
+        return entry[0] if entry else None
+
+    def begin(self, file_id, task):
+        # Returns None if the download should go ahead, otherwise the state that makes it redundant
+        with self.lock:
+            if file_id in self.in_flight: return 'queued'
+            event, payload = self.latest.get(file_id, (None, {}))
+            if event == 'completed' and (not payload.get('path') or os.path.exists(payload['path'])): return 'completed'
+            self.in_flight.add(file_id)
+            self._append(file_id, 'queued', task)
+        return None
+
+    def complete(self, file_id, path=None):
+        with self.lock:
+            self.in_flight.discard(file_id)
+            self._append(file_id, 'completed', {'path': path} if path else None)
+
+    def fail(self, file_id, error=None):
+        with self.lock:
+            self.in_flight.discard(file_id)
+            self._append(file_id, 'failed', {'error': str(error)} if error else None)
+
+    def unfinished(self):
+        with self.lock:
+            return [dict(payload, file_id=file_id) for file_id, (event, payload) in self.latest.items()
+                    if event == 'queued' and file_id not in self.in_flight]
+
+    def close(self):
+        with self.lock: self.conn.close()
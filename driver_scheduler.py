@@ -0,0 +1,147 @@
+# driver_scheduler.py
+import time
+import heapq
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first: what the user is looking at, then the filter tree for it, then downloads through the main browser
+INTERACTIVE, FILTERS, DOWNLOAD = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', FILTERS: 'filters', DOWNLOAD: 'download'}
+
+_context = threading.local()
+
+class Cancelled(Exception):
+    # Raised in a job whose generation was superseded; the job should unwind without touching the UI
+    pass
+
+def set_thread_priority(priority):
+    # For long-lived threads (download workers) that are not scheduler jobs
+    _context.priority = priority
+
+def job_context():
+    # The running job's (priority, token), for a thread that carries on its work after it returns
+    return getattr(_context, 'priority', INTERACTIVE), getattr(_context, 'token', None)
+
+def set_job_context(context):
+    _context.priority, _context.token = context
+
+class DriverScheduler:
+    # Arbitrates the single interactive browser. It is a lock whose waiters are served by priority rather
+    # than arrival, plus a small pool of job threads fed from a priority queue. Jobs may carry a generation
+    # token (lane, n): starting a new generation of a lane cancels queued jobs of older generations, makes
+    # their lock waits raise Cancelled, and lets running ones stop at their next check().
+    def __init__(self, name='driver_lock', workers=2):
+        self.name = name
+        self.cond = threading.Condition()
+        self.held = False
+        self.waiters = []
+        self.jobs = []
+        self.seq = itertools.count()
+        self.generations = {}
+        for i in range(workers):
+            threading.Thread(target=self._worker, daemon=True, name=f"driver-job-{i+1}").start()
+
+    # --- Generations ---
+    def begin(self, lane):
+        with self.cond:
+            self.generations[lane] = self.generations.get(lane, 0) + 1
+            self.cond.notify_all()
+            return (lane, self.generations[lane])
+
+    def token(self, lane):
+        with self.cond: return (lane, self.generations.get(lane, 0))
+
+    def is_current(self, token):
+        return token is None or self.generations.get(token[0], 0) == token[1]
+
+    def cancelled(self):
+        return not self.is_current(getattr(_context, 'token', None))
+
+    def check(self):
+        if self.cancelled(): raise Cancelled(f"superseded: {_context.token}")
+
+    # --- Priority lock ---
+    def acquire(self, blocking=True, timeout=-1, priority=None):
+        priority = getattr(_context, 'priority', INTERACTIVE) if priority is None else priority
+        token = getattr(_context, 'token', None)
+        ticket = (priority, next(self.seq))
+        start = time.perf_counter()
+        deadline = None if timeout < 0 else time.monotonic() + timeout
+        with self.cond:
+            heapq.heappush(self.waiters, ticket)
+            try:
+                while self.held or self.waiters[0] != ticket:
+                    if not self.is_current(token): raise Cancelled(f"superseded while waiting: {token}")
+                    if not blocking: return False
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0: return False
+                    self.cond.wait(remaining)
+                if not self.is_current(token): raise Cancelled(f"superseded while waiting: {token}")
+                self.held = True
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.cond.notify_all()
+        metrics.observe("lock_wait", time.perf_counter() - start, lock=self.name, priority=PRIORITY_NAMES.get(priority, priority))
+        return True
+
+    def release(self):
+        with self.cond:
+            self.held = False
+            self.cond.notify_all()
+
+    def locked(self):
+        return self.held
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @contextmanager
+    def slot(self, priority):
+        self.acquire(priority=priority)
+        try: yield self
+        finally: self.release()
+
+    # --- Jobs ---
+    def submit(self, func, *args, priority=INTERACTIVE, token=None, on_done=None):
+        # on_done(result, error, token) runs on the worker thread, also for jobs dropped as stale
+        # (with a Cancelled error), so callers can always undo their "busy" state.
+        with self.cond:
+            heapq.heappush(self.jobs, (priority, next(self.seq), func, args, token, on_done))
+            self.cond.notify_all()
+
+    def pending(self):
+        return len(self.jobs)
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.jobs: self.cond.wait()
+                priority, _, func, args, token, on_done = heapq.heappop(self.jobs)
+            _context.priority, _context.token = priority, token
+            result, error = None, None
+            try:
+                self.check()
+                with metrics.timer("scheduler_job", priority=PRIORITY_NAMES.get(priority, priority)):
+                    result = func(*args)
+            except Cancelled as e:
+                logger.info(f"Dropped stale job {getattr(func, '__name__', func)}: {e}")
+                error = e
+            except Exception as e:
+                logger.error(f"Job {getattr(func, '__name__', func)} failed: {e}", exc_info=True)
+                error = e
+            finally:
+                _context.priority, _context.token = INTERACTIVE, None
+            if on_done:
+                try: on_done(result, error, token)
+                except Exception as e: logger.error(f"Job callback failed: {e}", exc_info=True)
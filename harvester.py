@@ -0,0 +1,113 @@
+# harvester.py
+import os
+import csv
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = ['file_id', 'title', 'rav', 'date', 'duration', 'page', 'source']
+
+class HarvestWriter:
+    # Streams records to JSONL or CSV as they arrive; appends when resuming
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        self.seen = self._load_seen()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', encoding='utf-8', newline='')
+        if self.fmt == 'csv':
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            if new_file: self.csv.writeheader()
+
+    def _load_seen(self):
+        if not os.path.exists(self.path): return set()
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            if self.fmt == 'csv': return {row['file_id'] for row in csv.DictReader(f) if row.get('file_id')}
+            return {json.loads(line).get('file_id') for line in f if line.strip()} - {None, ''}
+
+    def write(self, record):
+        if record.get('file_id'):
+            if record['file_id'] in self.seen: return False
+            self.seen.add(record['file_id'])
+        if self.fmt == 'csv': self.csv.writerow(record)
+        else: self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        return True
+
+    def close(self):
+        self.file.close()
+
+class Harvester:
+    def __init__(self, scraper, progress_callback=None):
+        self.scraper = scraper
+        self.progress_callback = progress_callback
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def _open(self, query=None, href=None, filters=None):
+        result = self.scraper.perform_search(query) if query else self.scraper.navigate_to_topic_by_href(href)
+        if result and result['type'] == 'rav_selection' and len(result['data']) == 1:
+            result = self.scraper.select_rav_from_results(0)
+        # The whole saved filter set is applied at once, so it costs a single reload
+        if filters and result and result['type'] == 'initial_data':
+            result = self.scraper.apply_filters(filters)
+        return result
+
+    def iter_shiurim(self, query=None, href=None, start_page=0, max_pages=None, on_page_done=None, filters=None):
+        source = query or href
+        result = self._open(query, href, filters)
+        if not result or result['type'] != 'initial_data':
+            raise RuntimeError(result.get('message', 'לא נמצאו שיעורים.') if result else 'לא נמצאו שיעורים.')
+        page, previous_ids = 0, None
+        while not self.stopped:
+            shiurim = result['data']['shiurim']
+            ids = [s.get('file_id') or s['title'] for s in shiurim]
+            if not shiurim or ids == previous_ids: break
+            previous_ids = ids
+            if page >= start_page:
+                for shiur in shiurim:
+                    yield dict(shiur, page=page, source=source)
+                if on_page_done: on_page_done(page)
+            page += 1
+            if max_pages and page >= max_pages: break
+            if not result['data'].get('pagination', {}).get('has_next', True): break
+            result = self.scraper.navigate_to_next_page()
+            if not result or result['type'] != 'initial_data': break
+
+    def harvest(self, output_path, query=None, href=None, fmt=None, download=False, max_pages=None, on_record=None, filters=None):
+        state_path = output_path + '.state.json'
+        source = query or href
+        filters = sorted(filters or [])
+        state = {}
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f: state = json.load(f)
+            if state.get('source') != source or state.get('filters', []) != filters: state = {}
+        start_page = state.get('page_done', -1) + 1
+        if start_page: logger.info(f"Resuming harvest of {source} from page {start_page + 1}")
+        writer = HarvestWriter(output_path, fmt)
+        written = state.get('count', 0)
+        def page_done(page):
+            with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'source': source, 'filters': filters, 'page_done': page, 'count': written}, f, ensure_ascii=False)
+            os.replace(state_path + '.tmp', state_path)
+            if self.progress_callback: self.progress_callback(page + 1, written)
+        try:
+            for record in self.iter_shiurim(query, href, start_page, max_pages, page_done, filters):
+                if not writer.write(record): continue
+                written += 1
+                if download:
+                    did = f"{record['id']}_{int(time.time())}"
+                    # Already downloaded or already queued shiurim are skipped by the journal
+                    if not self.scraper.queue_download(record, did): did = None
+                    if on_record: on_record(record, did)
+                elif on_record:
+                    on_record(record, None)
+        finally:
+            writer.close()
+        if not self.stopped and os.path.exists(state_path): os.remove(state_path)
+        logger.info(f"Harvest of {source} finished: {written} shiurim written to {output_path}")
+        return written
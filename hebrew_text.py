@@ -0,0 +1,68 @@
+# hebrew_text.py
+import re
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+# Niqqud and cantillation marks, plus geresh/gershayim and ASCII quotes used in abbreviations (רמב"ם, ר')
+MARKS_RE = re.compile(r"[֑-ׇ׳״'\"`]")
+SPACE_RE = re.compile(r"\s+")
+
+def normalize(text):
+    text = MARKS_RE.sub("", text or "").translate(FINAL_LETTERS).lower()
+    return SPACE_RE.sub(" ", text).strip()
+
+# One-letter prefixes (ו, ה, ב, ל, מ, ש, כ) glued to the word they modify: "ובבראשית", "לרמבמ"
+PREFIX_LETTERS = "ובהלמשכ"
+
+def prefix_variants(word, max_prefixes=2):
+    # The word without up to max_prefixes leading prefix letters, keeping at least three letters
+    variants = []
+    while len(variants) < max_prefixes and len(word) > 3 and word[0] in PREFIX_LETTERS:
+        word = word[1:]
+        variants.append(word)
+    return variants
+
+def ngrams(text, n):
+    if len(text) < n: return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class NgramIndex:
+    # Substring search over normalized texts: posting lists of n-grams narrow the candidates,
+    # a final substring check keeps the old "term in name" semantics.
+    def __init__(self, texts=(), n=2):
+        self.n = n
+        self.texts = []
+        self.postings = {}
+        self.single_chars = {}
+        for text in texts: self.add(text)
+
+    def add(self, text):
+        item_id = len(self.texts)
+        norm = normalize(text)
+        self.texts.append(norm)
+        for gram in ngrams(norm, self.n): self.postings.setdefault(gram, set()).add(item_id)
+        for ch in set(norm): self.single_chars.setdefault(ch, set()).add(item_id)
+        return item_id
+
+    def search(self, query):
+        q = normalize(query)
+        if not q: return list(range(len(self.texts)))
+        if len(q) < self.n: return sorted(self.single_chars.get(q, ()))
+        lists = sorted((self.postings.get(g, set()) for g in ngrams(q, self.n)), key=len)
+        if not lists[0]: return []
+        candidates = set(lists[0]).intersection(*lists[1:])
+        return sorted(i for i in candidates if q in self.texts[i])
+
+    def fuzzy(self, query, limit=20, threshold=0.5):
+        # Ranks texts by the share of the query's n-grams they contain, so a typo or a missing letter
+        # still matches; exact substrings rank first, then shorter texts.
+        q = normalize(query)
+        if len(q) < self.n: return self.search(query)[:limit]
+        grams = ngrams(q, self.n)
+        hits = {}
+        for gram in grams:
+            for i in self.postings.get(gram, ()): hits[i] = hits.get(i, 0) + 1
+        scored = []
+        for i, common in hits.items():
+            score = common / len(grams) + (1 if q in self.texts[i] else 0)
+            if score >= threshold: scored.append((-score, len(self.texts[i]), i))
+        return [i for _, _, i in sorted(scored)[:limit]]
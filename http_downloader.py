@@ -0,0 +1,133 @@
+# http_downloader.py
+import os
+import re
+import hashlib
+import mimetypes
+import logging
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+AUTH_STATUS = {401, 403}
+MEDIA_MIME_PREFIXES = ('audio/', 'video/', 'application/octet-stream')
+SKIPPED_HEADERS = {'cookie', 'range', 'host', 'content-length', 'connection', 'accept-encoding'}
+
+def _filename_from_response(response, fallback):
+    disposition = response.headers.get('Content-Disposition', '')
+    if m := re.search(r"filename\*\s*=\s*[^']*''([^;]+)", disposition):
+        return urllib.parse.unquote(m.group(1).strip().strip('"'))
+    if m := re.search(r'filename\s*=\s*"?([^";]+)"?', disposition):
+        return m.group(1).strip()
+    name = os.path.basename(urllib.parse.unquote(urllib.parse.urlparse(response.url).path))
+    if os.path.splitext(name)[1]: return name
+    ext = mimetypes.guess_extension(response.headers.get('Content-Type', '').split(';')[0].strip()) or ''
+    return f"{fallback}{ext}"
+
+def _total_size(response, already_received):
+    if m := re.search(r'/(\d+)$', response.headers.get('Content-Range', '')): return int(m.group(1))
+    length = response.headers.get('Content-Length')
+    return int(length) + already_received if length and length.isdigit() else None
+
+def _is_media(response):
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type.startswith(MEDIA_MIME_PREFIXES) or 'attachment' in response.headers.get('Content-Disposition', '').lower()
+
+class NotMedia(requests.HTTPError):
+    # A 2xx answer that is not the file, e.g. a login page after the session expired or the SPA's fallback page.
+    # Treated like a refusal: the request was wrong, repeating it as is won't help.
+    pass
+
+def is_client_error(exc):
+    response = getattr(exc, 'response', None)
+    if isinstance(exc, NotMedia): return True
+    return isinstance(exc, requests.HTTPError) and response is not None and 400 <= response.status_code < 500
+
+class IncompleteDownload(IOError):
+    # The server closed the response before Content-Length bytes arrived; the .part file is kept for a resume
+    pass
+
+def _part_path(dest_dir, key):
+    return os.path.join(dest_dir, f".{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.part")
+
+def _safe_filename(name):
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name).strip(' .') or "download"
+
+class HttpDownloader:
+    def __init__(self, max_workers=6, store_file=None, chunk_size=CHUNK_SIZE, refresh_cookies=None):
+        self.chunk_size = chunk_size
+        # store_file(src_path, dest_dir, filename) moves a finished download into place and returns its path
+        self.store_file = store_file
+        # refresh_cookies() returns the browser's current cookies; called once when the server refuses a transfer
+        self.refresh_cookies = refresh_cookies
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-download")
+        self.cookie_lock = threading.Lock()
+
+    def load_browser_session(self, cookies, user_agent=None):
+        with self.cookie_lock:
+            for c in cookies:
+                self.session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
+            if user_agent: self.session.headers['User-Agent'] = user_agent
+
+    def submit(self, url, dest_dir, filename_hint, on_done, headers=None, progress=None, part_key=None):
+        # part_key names the .part file a retry resumes from; it defaults to the URL, which is not stable
+        # when the same file can be reached through a guessed and a captured URL
+        future = self.executor.submit(self._download, url, dest_dir, filename_hint, headers or {}, progress, part_key=part_key or url)
+        future.add_done_callback(lambda f: on_done(f.result() if not f.exception() else None, f.exception()))
+        return future
+
+    def discard_partial(self, dest_dir, part_key):
+        # For downloads that will not be retried, so their bytes don't linger in the library folder
+        try: os.remove(_part_path(dest_dir, part_key))
+        except FileNotFoundError: pass
+        except OSError as e: logger.warning(f"Could not remove partial download {part_key}: {e}")
+
+    def _download(self, url, dest_dir, filename_hint, headers, progress=None, refreshed=False, part_key=None):
+        headers = {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS and not k.startswith(':')}
+        part_path = _part_path(dest_dir, part_key or url)
+        received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if received: headers['Range'] = f"bytes={received}-"
+        with self.session.get(url, headers=headers, stream=True, timeout=(10, 60)) as r:
+            if r.status_code == 416:
+                logger.info(f"Range not satisfiable, restarting {url}")
+                os.remove(part_path)
+                return self._download(url, dest_dir, filename_hint, headers, progress, refreshed, part_key)
+            refused = r.status_code in AUTH_STATUS or (r.ok and not _is_media(r))
+            if refused and self.refresh_cookies and not refreshed:
+                # The browser's login may have been renewed since the cookies were copied
+                logger.info(f"Got {r.status_code} {r.headers.get('Content-Type', '')} for {url}, retrying with fresh browser cookies")
+                self.load_browser_session(self.refresh_cookies())
+                return self._download(url, dest_dir, filename_hint, headers, progress, True, part_key)
+            r.raise_for_status()
+            if not _is_media(r):
+                raise NotMedia(f"{url} answered with {r.headers.get('Content-Type') or 'no Content-Type'}, not a media file", response=r)
+            mode = 'ab' if received and r.status_code == 206 else 'wb'
+            if mode == 'wb': received = 0
+            total = _total_size(r, received)
+            filename = _safe_filename(_filename_from_response(r, filename_hint))
+            with open(part_path, mode) as f:
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk); received += len(chunk)
+                        if progress: progress(received, total)
+        if total and received < total:
+            raise IncompleteDownload(f"received {received} of {total} bytes from {url}")
+        if self.store_file:
+            final_path = self.store_file(part_path, dest_dir, filename)
+        else:
+            final_path = os.path.join(dest_dir, filename)
+            os.replace(part_path, final_path)
+        logger.info(f"Streamed {url} to {final_path} ({received} bytes)")
+        return final_path
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
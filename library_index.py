@@ -0,0 +1,137 @@
+# library_index.py
+import os
+import shutil
+import hashlib
+import logging
+import threading
+
+try:
+    import _winapi
+except ImportError:
+    _winapi = None
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK = 1024 * 1024
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK): digest.update(chunk)
+    return digest.hexdigest()
+
+def _kernel_copy(src_path, dest_path):
+    # On Windows the copy is done by the OS (CopyFile2 from Python 3.12, CopyFileExW before that) instead of
+    # a read/write loop in Python; elsewhere copy2 already uses sendfile / fcopyfile.
+    if os.name != 'nt':
+        shutil.copy2(src_path, dest_path); return
+    if hasattr(_winapi, 'CopyFile2'):
+        _winapi.CopyFile2(src_path, dest_path, 0); return
+    import ctypes
+    if not ctypes.windll.kernel32.CopyFileExW(ctypes.c_wchar_p(src_path), ctypes.c_wchar_p(dest_path), None, None, None, 0):
+        raise ctypes.WinError()
+
+def fast_move(src_path, dest_path):
+    # A rename on the same volume. Across drives a kernel copy into a temporary name, so a half-copied
+    # file never carries the final name.
+    if os.stat(src_path).st_dev == os.stat(os.path.dirname(dest_path)).st_dev:
+        os.replace(src_path, dest_path); return
+    tmp_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.copying")
+    try:
+        _kernel_copy(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+    os.remove(src_path)
+
+class LibraryIndex:
+    # In-memory view of one destination folder: taken names, the next free " (n)" suffix per name,
+    # and files grouped by size so identical content is found by hashing only same-size files.
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.names = set()
+        self.reserved = set()  # handed out by reserve() but not on disk yet
+        self.next_suffix = {}
+        self.by_size = {}
+        self.digests = {}
+        os.makedirs(root, exist_ok=True)
+        for entry in os.scandir(root):
+            if entry.is_file() and not entry.name.startswith('.'):
+                self._add(entry.name, entry.stat().st_size)
+        logger.info(f"Indexed {len(self.names)} files in {root}")
+
+    @staticmethod
+    def _key(name):
+        return os.path.normcase(name)
+
+    def _add(self, name, size):
+        self.names.add(self._key(name))
+        self.by_size.setdefault(size, set()).add(name)
+
+    def _forget(self, name):
+        self.names.discard(self._key(name))
+        self.digests.pop(name, None)
+        for names in self.by_size.values(): names.discard(name)
+
+    def reserve(self, filename):
+        with self.lock:
+            stem, ext = os.path.splitext(filename)
+            candidate, counter = filename, self.next_suffix.get(self._key(filename), 1)
+            while True:
+                # One exists() call per candidate keeps the index current with files added or deleted behind our back
+                key, on_disk = self._key(candidate), os.path.exists(os.path.join(self.root, candidate))
+                if key in self.names and not on_disk and key not in self.reserved: self._forget(candidate)
+                if key not in self.names and not on_disk: break
+                self.names.add(key)
+                candidate = f"{stem} ({counter}){ext}"
+                counter += 1
+            if candidate != filename: self.next_suffix[self._key(filename)] = counter
+            self.names.add(self._key(candidate))
+            self.reserved.add(self._key(candidate))
+            return os.path.join(self.root, candidate)
+
+    def release(self, path):
+        with self.lock:
+            key = self._key(os.path.basename(path))
+            self.names.discard(key); self.reserved.discard(key)
+
+    def _digest(self, name):
+        path = os.path.join(self.root, name)
+        st = os.stat(path)
+        cached = self.digests.get(name)
+        if cached and cached[0] == (st.st_size, st.st_mtime_ns): return cached[1]
+        digest = file_digest(path)
+        self.digests[name] = ((st.st_size, st.st_mtime_ns), digest)
+        return digest
+
+    def find_duplicate(self, src_path, size=None):
+        size = os.path.getsize(src_path) if size is None else size
+        with self.lock: candidates = list(self.by_size.get(size, ()))
+        if not candidates: return None
+        src_digest = file_digest(src_path)
+        for name in candidates:
+            try:
+                if self._digest(name) == src_digest: return os.path.join(self.root, name)
+            except OSError:
+                with self.lock: self._forget(name)
+        return None
+
+    def store(self, src_path, filename):
+        # Moves src_path into the library and returns its final path, or the path of an identical file already there
+        size = os.path.getsize(src_path)
+        if duplicate := self.find_duplicate(src_path, size):
+            os.remove(src_path)
+            logger.info(f"{filename} is identical to {duplicate}, not storing it twice")
+            return duplicate
+        dest_path = self.reserve(filename)
+        try:
+            fast_move(src_path, dest_path)
+        except BaseException:
+            self.release(dest_path)
+            raise
+        with self.lock:
+            self.reserved.discard(self._key(os.path.basename(dest_path)))
+            self.by_size.setdefault(size, set()).add(os.path.basename(dest_path))
+        return dest_path
@@ -1,9 +1,17 @@
 # main_gui.py
+import time
+STARTUP_STARTED = time.perf_counter()
 import customtkinter as ctk
 import threading
-import time
-from scraper_logic import Scraper, initial_login
-from tkinter import Menu
+from harvester import Harvester
+from virtual_list import VirtualList
+from hebrew_text import NgramIndex
+from ui_event_bus import UIEventBus
+from transfer_stats import format_bytes
+from topics_catalog import TopicCatalog, load_topics
+from shiur_index import ShiurIndex, search_local
+from driver_scheduler import INTERACTIVE, FILTERS, Cancelled
+from tkinter import Menu, filedialog, messagebox
 import platform
 import logging
 from pathlib import Path
@@ -23,24 +31,129 @@ def setup_logging():
 
 logger = logging.getLogger(__name__)
 
+UI_FRAME_MS = 50
+FILTER_APPLY_DELAY_MS = 600
+
+def log_startup(stage):
+    logger.info(f"Startup: {stage} after {time.perf_counter() - STARTUP_STARTED:.2f}s")
+
 class App(ctk.CTk):
-    def __init__(self, driver):
+    def __init__(self):
         super().__init__()
         ctk.set_appearance_mode("Light")
         self.title("קול הלשון"); self.geometry("1200x750")
         self.grid_columnconfigure(1, weight=1); self.grid_rowconfigure(1, weight=1)
         
-        self.scraper = Scraper(driver, self.safe_update_status, self.safe_update_download_progress)
+        self.events = UIEventBus()
+        # The browser starts and logs in on a background thread; until then user actions wait in pending_actions
+        self.scraper = None
+        self.pending_actions = []
+        self.closing = False
+        self.loading_jobs = 0
         self.active_filters = set()
-        self.filter_checkboxes = {}
+        self.filter_items = []
+        self.filter_index = NgramIndex()
+        self.filter_header_of = []
+        self.filter_search_job = None
+        self.filter_apply_job = None
         self.download_widgets = {}
+        self.downloads_restored = False
+        self.current_view_key = None
+        self.current_source = None
+        self.harvester = None
+        self.topic_catalog = TopicCatalog()
+        self.topic_match_count = 0
+        # Opened here rather than by the scraper, so local search works before the browser is up
+        try: self.shiur_index = ShiurIndex()
+        except Exception as e:
+            logger.error(f"Shiur index unavailable: {e}")
+            self.shiur_index = None
         self.create_widgets()
+        # Chrome starts while the window is still being drawn
+        self.run_in_thread(self.connect_backend, self.on_backend_ready, spinner=False)
         self.after(100, self.initialize_backend)
+        self.after(UI_FRAME_MS, self.drain_ui_events)
 
     def initialize_backend(self):
+        log_startup("window shown")
+        self.on_topics_loaded(load_topics())
         self.start_drive_refresh()
-        self.run_in_thread(self.scraper.load_topics_from_file, self.on_topics_loaded)
+
+    def connect_backend(self):
+        # selenium and everything behind it load here, off the UI thread. Any failure ends in
+        # on_backend_ready(None), so queued actions are not left waiting for a browser that never comes.
+        driver = None
+        try:
+            import scraper_logic
+            log_startup("scraper_logic imported")
+            driver = scraper_logic.initial_login(self.safe_update_status, choose_driver=lambda: self.choose_driver_path(scraper_logic))
+            log_startup("browser started and logged in" if driver else "login failed")
+            if not driver: return None
+            if self.closing:
+                driver.quit(); return None
+            return scraper_logic.Scraper(driver, self.safe_update_status, self.safe_update_download_progress, self.safe_on_results_revalidated,
+                                         shiur_index=self.shiur_index)
+        except Exception as e:
+            logger.error(f"Backend failed to start: {e}", exc_info=True)
+            if driver:
+                try: driver.quit()
+                except Exception: pass
+            return None
+
+    def choose_driver_path(self, scraper_logic):
+        # Called on the login thread; Tk dialogs may only run on the UI thread, so it waits for one there
+        done, chosen = threading.Event(), []
+        def ask():
+            try: chosen.append(filedialog.askopenfilename(title=scraper_logic.DRIVER_DIALOG_TITLE, filetypes=scraper_logic.DRIVER_FILE_TYPES))
+            finally: done.set()
+        self.after(0, ask)
+        done.wait()
+        return chosen[0] if chosen else None
+
+    def on_backend_ready(self, scraper):
+        if self.closing:
+            if scraper: scraper.close_driver()
+            return
+        if not scraper:
+            messagebox.showerror("קול הלשון", "ההתחברות נכשלה. התוכנה תיסגר.")
+            self.destroy(); return
+        self.scraper = scraper
+        log_startup("backend ready")
         self.safe_update_status("מוכן.")
+        actions, self.pending_actions = self.pending_actions, []
+        for action in actions: action()
+
+    def when_ready(self, action):
+        if self.scraper: action(); return
+        self.pending_actions.append(action)
+        self.safe_update_status("מתחבר... הפעולה תתבצע כשהדפדפן יהיה מוכן.")
+
+    def run_scraper(self, method, callback=None, *args, spinner=True, kind='navigate'):
+        # Resolves the method only when it runs, so calls made during startup are queued rather than lost
+        self.when_ready(lambda: self.schedule_scraper(method, callback, args, spinner, kind))
+
+    def schedule_scraper(self, method, callback, args, spinner, kind):
+        # 'navigate' leaves the page and supersedes everything queued for it, 'filter' refines the current
+        # page and supersedes only its view (results, filter tree), 'filters' belongs to the current view.
+        # Results whose view token is no longer current are dropped instead of replacing a newer view.
+        if self.harvester:
+            # The harvest walks the pages in the interactive browser; anything else would move it elsewhere
+            self.safe_update_status("האיסוף משתמש בדפדפן. יש לעצור אותו לפני מעבר לדף אחר."); return
+        scheduler = self.scraper.scheduler
+        if kind == 'navigate': job_token, view = scheduler.begin('page'), scheduler.begin('view')
+        elif kind == 'filter': job_token, view = scheduler.token('page'), scheduler.begin('view')
+        else: job_token = view = scheduler.token('view')
+        if spinner: self.start_loading()
+        def deliver(result, error):
+            if spinner: self.stop_loading()
+            if not scheduler.is_current(view):
+                logger.info(f"Dropped stale result of {method} ({view})")
+            elif error is not None:
+                if not isinstance(error, Cancelled): self.safe_update_status("❌ שגיאה, בדוק לוגים.")
+            elif callback: callback(result)
+        on_done = lambda result, error, token: self.after(0, deliver, result, error)
+        scheduler.submit(getattr(self.scraper, method), *args, priority=FILTERS if kind == 'filters' else INTERACTIVE,
+                         token=job_token, on_done=on_done)
 
     def create_widgets(self):
         top_frame = ctk.CTkFrame(self, height=50, corner_radius=0)
@@ -51,16 +164,19 @@ class App(ctk.CTk):
         self.search_entry.bind("<Return>", self.start_search)
         self.search_button = ctk.CTkButton(top_frame, text="חיפוש", width=100, command=self.start_search)
         self.search_button.grid(row=0, column=3, padx=5, pady=10)
+        self.local_search_var = ctk.StringVar(value="off")
+        self.local_search_check = ctk.CTkCheckBox(top_frame, text="חיפוש מקומי", variable=self.local_search_var, onvalue="on", offvalue="off")
+        self.local_search_check.grid(row=0, column=5, padx=(5, 10), pady=10)
         
-        self.reload_button = ctk.CTkButton(top_frame, text="רענן דף", width=100, command=lambda: self.run_in_thread(self.scraper.refresh_browser_page, self.on_initial_data_loaded))
+        self.reload_button = ctk.CTkButton(top_frame, text="רענן דף", width=100, command=lambda: self.run_scraper('refresh_browser_page', self.on_initial_data_loaded))
         self.reload_button.grid(row=0, column=2, padx=5, pady=10)
-        self.re_extract_button = ctk.CTkButton(top_frame, text="טען מחדש", width=100, command=lambda: self.run_in_thread(self.scraper.refresh_current_page_content, self.on_initial_data_loaded))
+        self.re_extract_button = ctk.CTkButton(top_frame, text="טען מחדש", width=100, command=lambda: self.run_scraper('refresh_current_page_content', self.on_initial_data_loaded))
         self.re_extract_button.grid(row=0, column=1, padx=5, pady=10)
         
         self.categories_button = ctk.CTkButton(top_frame, text="קטגוריות", width=120)
         self.categories_button.grid(row=0, column=0, padx=(10, 5), pady=10)
         self.categories_menu = Menu(self.categories_button, tearoff=0)
-        self.categories_button.configure(command=lambda: self.categories_menu.tk_popup(self.categories_button.winfo_rootx(), self.categories_button.winfo_rooty() + self.categories_button.winfo_height()))
+        self.categories_button.configure(command=self.show_categories_menu)
 
         left_panel = ctk.CTkTabview(self, width=350)
         left_panel.grid(row=1, column=0, sticky="ns", padx=10, pady=10)
@@ -69,9 +185,12 @@ class App(ctk.CTk):
         filters_tab.grid_rowconfigure(1, weight=1); filters_tab.grid_columnconfigure(0, weight=1)
         self.filter_search_entry = ctk.CTkEntry(filters_tab, placeholder_text="חפש מסנן...", justify="right")
         self.filter_search_entry.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
-        self.filter_search_entry.bind("<KeyRelease>", self.filter_checkbox_list)
+        self.filter_search_entry.bind("<KeyRelease>", self.schedule_filter_search)
         self.filters_scroll_frame = ctk.CTkScrollableFrame(filters_tab, label_text="")
         self.filters_scroll_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        self.filters_list = VirtualList(filters_tab, 30, self.make_filter_row, self.bind_filter_row)
+        self.download_totals_label = ctk.CTkLabel(self.downloads_tab, text="", anchor="e", font=ctk.CTkFont(size=11))
+        self.download_totals_label.pack(fill="x", padx=10)
         self.downloads_scroll_frame = ctk.CTkScrollableFrame(self.downloads_tab, label_text="הורדות פעילות")
         self.downloads_scroll_frame.pack(expand=True, fill="both", padx=5, pady=5)
 
@@ -81,6 +200,9 @@ class App(ctk.CTk):
         self.active_filters_frame = ctk.CTkFrame(results_outer_frame, fg_color="transparent")
         self.results_frame = ctk.CTkScrollableFrame(results_outer_frame, label_text="תוצאות")
         self.results_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        # Shiurim go to a virtualized list; messages and rav choices stay in the plain frame
+        self.title_font, self.meta_font = ctk.CTkFont(weight="bold"), ctk.CTkFont(size=11)
+        self.results_list = VirtualList(results_outer_frame, 64, self.make_result_row, self.bind_result_row, label_text="תוצאות")
 
         bottom_frame = ctk.CTkFrame(self); bottom_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5, padx=10)
         bottom_frame.grid_columnconfigure(1, weight=1)
@@ -88,8 +210,10 @@ class App(ctk.CTk):
         self.drive_selector_frame.grid(row=0, column=0, padx=5)
         ctk.CTkLabel(self.drive_selector_frame, text="שמור ב:").pack(side="right")
         self.setup_drive_selector()
-        self.next_page_button = ctk.CTkButton(bottom_frame, text="הבא ->", command=lambda: self.run_in_thread(self.scraper.navigate_to_next_page, self.on_initial_data_loaded))
+        self.next_page_button = ctk.CTkButton(bottom_frame, text="הבא ->", command=lambda: self.run_scraper('navigate_to_next_page', self.on_initial_data_loaded))
         self.next_page_button.grid(row=0, column=2, padx=5)
+        self.harvest_button = ctk.CTkButton(bottom_frame, text="אסוף הכל", width=100, command=lambda: self.when_ready(self.start_harvest))
+        self.harvest_button.grid(row=0, column=3, padx=5)
         self.status_bar = ctk.CTkLabel(self, text="", anchor="e", height=25)
         self.status_bar.grid(row=3, column=0, columnspan=2, sticky="ew", padx=10)
         self.progress_bar = ctk.CTkProgressBar(self, orientation="horizontal", mode="indeterminate")
@@ -109,10 +233,14 @@ class App(ctk.CTk):
         if drives:
             self.drive_option_menu.set(drives[0])
             self.on_drive_selected(drives[0])
+        if not self.downloads_restored:
+            # Only once a destination is chosen, so restored downloads land where new ones would
+            self.downloads_restored = True
+            self.when_ready(self.restore_downloads)
 
     def on_drive_selected(self, selected_display):
         if path := self.drive_map.get(selected_display):
-            self.scraper.set_final_download_path(path)
+            self.when_ready(lambda: self.scraper.set_final_download_path(path))
 
     def get_drives(self):
         drives, drive_map = [str(Path.home())], {str(Path.home()): str(Path.home())}
@@ -139,69 +267,201 @@ class App(ctk.CTk):
         threading.Thread(target=target_wrapper, daemon=True).start()
 
     def start_loading(self):
+        self.loading_jobs += 1
+        if self.loading_jobs > 1: return
         self.progress_bar.grid(row=4, column=0, columnspan=2, sticky="ew", pady=5); self.progress_bar.start()
         self.set_ui_state("disabled")
 
     def stop_loading(self):
+        self.loading_jobs = max(0, self.loading_jobs - 1)
+        if self.loading_jobs: return
         self.progress_bar.stop(); self.progress_bar.grid_forget()
         self.set_ui_state("normal")
 
     def set_ui_state(self, state):
+        # Navigation stays disabled while a harvest owns the browser; the harvest button is its stop button
         for w in [self.search_button, self.reload_button, self.re_extract_button, self.categories_button, self.next_page_button]:
-            w.configure(state=state)
-
-    def safe_update_status(self, msg): self.after(0, lambda: self.status_bar.configure(text=msg))
-    def safe_update_download_progress(self, did, prog, stat): self.after(0, self.update_download_widget, did, prog, stat)
+            w.configure(state="disabled" if self.harvester else state)
+        self.harvest_button.configure(state=state)
+
+    def safe_update_status(self, msg): self.events.publish_status(msg)
+    def safe_update_download_progress(self, did, prog, stat, info=None): self.events.publish_progress(did, prog, stat, info)
+
+    def drain_ui_events(self):
+        try:
+            status, progress = self.events.drain()
+            if status is not None: self.status_bar.configure(text=status)
+            for did, update in progress.items(): self.update_download_widget(did, *update)
+            if progress: self.update_download_totals()
+        except Exception as e:
+            logger.error(f"UI update failed: {e}", exc_info=True)
+        self.after(UI_FRAME_MS, self.drain_ui_events)
+    def safe_on_results_revalidated(self, result): self.after(0, self.on_results_revalidated, result)
+
+    def on_results_revalidated(self, result):
+        # A cached view was shown; only replace it if the user is still looking at it
+        if not self.scraper.scheduler.is_current(result.get('view')): return
+        if result.get('cache_key') and result['cache_key'] == self.current_view_key:
+            self.safe_update_status("התוצאות עודכנו מהאתר.")
+            self.on_initial_data_loaded(result)
 
     def on_topics_loaded(self, topics):
         if not topics: return
+        self.topic_catalog = TopicCatalog(topics)
+        self.build_categories_menu()
+
+    def build_categories_menu(self):
+        # Submenus stay empty until first opened
         self.categories_menu.delete(0, 'end')
-        for main_cat, sub_cats in topics.items():
+        self.topic_match_count = 0
+        for main_cat in self.topic_catalog.categories():
             sub_menu = Menu(self.categories_menu, tearoff=0)
-            for sub_cat in sub_cats:
-                cmd = lambda h=sub_cat['href']: self.run_in_thread(self.scraper.navigate_to_topic_by_href, self.on_initial_data_loaded, h)
-                sub_menu.add_command(label=sub_cat['name'], command=cmd)
+            sub_menu.configure(postcommand=lambda m=sub_menu, c=main_cat: self.fill_topic_menu(m, c))
             self.categories_menu.add_cascade(label=main_cat, menu=sub_menu)
+        self.categories_menu.add_separator()
+        self.categories_menu.add_command(label="רענן קטגוריות מהאתר", command=self.start_topics_refresh)
+
+    def fill_topic_menu(self, menu, main_cat):
+        if menu.index('end') is not None: return
+        for _, name, href in self.topic_catalog.topics_in(main_cat):
+            menu.add_command(label=name, command=lambda h=href: self.open_topic(h))
+
+    def show_categories_menu(self):
+        # Text in the search box puts the closest topics above the categories
+        menu = self.categories_menu
+        if self.topic_match_count: menu.delete(0, self.topic_match_count - 1)
+        query = self.search_entry.get().strip()
+        matches = self.topic_catalog.search(query, 10) if query else []
+        for i, (main_cat, name, href) in enumerate(matches):
+            menu.insert_command(i, label=f"{name} · {main_cat}", command=lambda h=href: self.open_topic(h))
+        if matches: menu.insert_separator(len(matches))
+        self.topic_match_count = len(matches) + 1 if matches else 0
+        menu.tk_popup(self.categories_button.winfo_rootx(), self.categories_button.winfo_rooty() + self.categories_button.winfo_height())
+
+    def start_topics_refresh(self):
+        def refresh():
+            from topic_crawler import TopicCrawler
+            progress = lambda done, total, main_cat: self.safe_update_status(f"מרענן קטגוריות... {done}/{total} ({main_cat})")
+            return TopicCrawler(self.scraper, self.topic_catalog, progress_callback=progress).refresh()
+        self.when_ready(lambda: self.run_in_thread(refresh, self.on_topics_refreshed, spinner=False))
+
+    def on_topics_refreshed(self, changed):
+        self.build_categories_menu()
+        self.safe_update_status(f"רענון הקטגוריות הסתיים ({changed} שינויים).")
+
+    def open_topic(self, href):
+        self.current_source = {'href': href}
+        self.reset_active_filters()
+        self.run_scraper('navigate_to_topic_by_href', self.on_initial_data_loaded, href)
 
     def start_search(self, event=None):
-        if query := self.search_entry.get():
-            self.run_in_thread(self.scraper.perform_search, self.on_initial_data_loaded, query)
+        query = self.search_entry.get()
+        if query and self.local_search_var.get() == "on":
+            self.search_local(query); return
+        if query:
+            self.current_source = {'query': query}
+            self.reset_active_filters()
+            self.run_scraper('perform_search', self.on_initial_data_loaded, query)
+
+    def search_local(self, query):
+        # Answered from the index on the UI thread: no browser and no scheduler involved
+        result = search_local(self.shiur_index, query)
+        if result['type'] == 'error':
+            self.safe_update_status(result['message']); return
+        self.current_source = None
+        self.reset_active_filters()
+        self.on_initial_data_loaded(result)
+        self.safe_update_status(f"נמצאו {len(result['data']['shiurim'])} שיעורים באינדקס המקומי.")
+
+    def start_harvest(self):
+        if self.harvester:
+            self.harvester.stop(); self.safe_update_status("עוצר איסוף..."); return
+        if not self.current_source:
+            self.safe_update_status("יש לבצע חיפוש או לבחור קטגוריה לפני האיסוף."); return
+        path = filedialog.asksaveasfilename(title="שמירת רשימת השיעורים", defaultextension=".jsonl",
+                                            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv")])
+        if not path: return
+        download = messagebox.askyesno("איסוף", "להוסיף את כל השיעורים לתור ההורדות?")
+        self.harvester = Harvester(self.scraper, lambda page, count: self.safe_update_status(f"נאספו {count} שיעורים ({page} עמודים)..."))
+        # Supersede whatever navigation is still queued, and drop results of jobs already running
+        self.scraper.scheduler.begin('page'); self.scraper.scheduler.begin('view')
+        self.harvest_button.configure(text="עצור איסוף")
+        self.set_ui_state("disabled" if self.loading_jobs else "normal")
+        on_record = (lambda rec, did: did and self.after(0, self.add_download_widget, did, rec['title'])) if download else None
+        source = dict(self.current_source)
+        def run():
+            try: return self.harvester.harvest(path, download=download, on_record=on_record, **source)
+            except Exception as e:
+                logger.error(f"Harvest failed: {e}", exc_info=True)
+                return None
+        def done(count):
+            self.harvester = None
+            self.harvest_button.configure(text="אסוף הכל")
+            self.set_ui_state("disabled" if self.loading_jobs else "normal")
+            if count is None: self.safe_update_status("❌ האיסוף נקטע. הפעלה חוזרת תמשיך מאותה נקודה.")
+            else: self.safe_update_status(f"האיסוף הסתיים: {count} שיעורים נשמרו ב-{path}")
+        self.run_in_thread(run, done, spinner=False)
 
     def clear_ui(self):
         for w in self.results_frame.winfo_children(): w.destroy()
+        self.results_list.set_items([])
+        self.show_results_list(False)
         for w in self.filters_scroll_frame.winfo_children(): w.destroy()
-        self.filter_checkboxes.clear()
+        self.set_filter_items([])
         self.next_page_button.configure(state="disabled")
         self.active_filters_frame.grid_forget()
 
     def on_initial_data_loaded(self, result):
         self.clear_ui()
+        self.current_view_key = result.get('cache_key') if result else None
         if not result or not result.get('data'): return
+        if result.get('cached'): self.safe_update_status("מוצג מהמטמון, בודק עדכונים...")
         
         if result['type'] == 'error':
             ctk.CTkLabel(self.results_frame, text=f"שגיאה: {result['message']}").pack()
         elif result['type'] == 'rav_selection':
             for rav in result['data']:
-                cmd = lambda r_id=rav['id']: self.run_in_thread(self.scraper.select_rav_from_results, self.on_initial_data_loaded, r_id)
+                cmd = lambda r_id=rav['id']: self.run_scraper('select_rav_from_results', self.on_initial_data_loaded, r_id)
                 ctk.CTkButton(self.results_frame, text=f"{rav['name']} ({rav['count']})", anchor="e").pack(fill="x", padx=5, pady=2)
+        elif result.get('local'):
+            self.populate_results(result['data']['shiurim'])
+            self.next_page_button.configure(state="disabled")
         elif result['type'] == 'initial_data':
             self.populate_results(result['data']['shiurim'])
             self.populate_filter_placeholders(result['data']['filter_categories'])
-            self.run_in_thread(self.scraper.expand_and_get_all_filters, self.on_full_filters_loaded, spinner=False)
+            self.run_scraper('expand_and_get_all_filters', self.on_full_filters_loaded, spinner=False, kind='filters')
+
+    def show_results_list(self, show):
+        if show:
+            self.results_frame.grid_remove(); self.results_list.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        else:
+            self.results_list.grid_remove(); self.results_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 
     def populate_results(self, shiurim):
         if not shiurim:
             ctk.CTkLabel(self.results_frame, text="לא נמצאו שיעורים.").pack(); return
         self.next_page_button.configure(state="normal")
-        for shiur in shiurim:
-            frame = ctk.CTkFrame(self.results_frame); frame.pack(fill="x", padx=5, pady=3)
-            frame.grid_columnconfigure(0, weight=1)
-            details = ctk.CTkFrame(frame, fg_color="transparent")
-            details.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
-            ctk.CTkLabel(details, text=shiur['title'], font=ctk.CTkFont(weight="bold"), anchor="e").pack(fill="x")
-            ctk.CTkLabel(details, text=f"{shiur['rav']} | {shiur['date']}", font=ctk.CTkFont(size=11), anchor="e").pack(fill="x")
-            dl_cmd = lambda s_id=shiur['id'], s_title=shiur['title']: self.start_download(s_id, s_title)
-            ctk.CTkButton(frame, text="הורדה", width=80, command=dl_cmd).grid(row=0, column=1, padx=10)
+        self.show_results_list(True)
+        self.results_list.set_items(shiurim)
+
+    def make_result_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        frame = ctk.CTkFrame(row); frame.pack(fill="both", expand=True, padx=5, pady=3)
+        frame.grid_columnconfigure(0, weight=1)
+        details = ctk.CTkFrame(frame, fg_color="transparent")
+        details.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
+        row.title_label = ctk.CTkLabel(details, text="", font=self.title_font, anchor="e"); row.title_label.pack(fill="x")
+        row.meta_label = ctk.CTkLabel(details, text="", font=self.meta_font, anchor="e"); row.meta_label.pack(fill="x")
+        row.download_button = ctk.CTkButton(frame, text="הורדה", width=80)
+        row.download_button.grid(row=0, column=1, padx=10)
+        return row
+
+    def bind_result_row(self, row, shiur):
+        row.title_label.configure(text=shiur['title'])
+        meta = [shiur['rav'], shiur['date']] + ([shiur['duration']] if shiur.get('duration') else [])
+        row.meta_label.configure(text=" | ".join(meta))
+        # Local hits carry the page they were listed on, which browser downloads need to find them
+        row.download_button.configure(command=lambda s=shiur: self.when_ready(lambda: self.start_download(s, s.get('state'))))
 
     def populate_filter_placeholders(self, categories):
         if not categories:
@@ -210,34 +470,90 @@ class App(ctk.CTk):
             ctk.CTkLabel(self.filters_scroll_frame, text=cat_name, font=ctk.CTkFont(weight="bold"), anchor="e").pack(fill="x", padx=5, pady=(10,0))
             ctk.CTkLabel(self.filters_scroll_frame, text="טוען...", text_color="gray", anchor="e").pack(fill="x", padx=15)
 
+    def show_filters_list(self, show):
+        if show:
+            self.filters_scroll_frame.grid_remove(); self.filters_list.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        else:
+            self.filters_list.grid_remove(); self.filters_scroll_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+
     def on_full_filters_loaded(self, filters_data):
         for w in self.filters_scroll_frame.winfo_children(): w.destroy()
         if not filters_data:
+            self.set_filter_items([])
             ctk.CTkLabel(self.filters_scroll_frame, text="לא נמצאו מסננים.").pack(); return
-        
-        for item in filters_data:
-            text, level = item['text'], item['level']
-            if level == -1:
-                ctk.CTkLabel(self.filters_scroll_frame, text=text, font=ctk.CTkFont(weight="bold"), anchor="e").pack(fill="x", padx=5, pady=(10,2))
-            else:
-                var = ctk.StringVar(value="on" if text in self.active_filters else "off")
-                cmd = lambda n=text, v=var: self.on_filter_toggled(n, v.get())
-                cb = ctk.CTkCheckBox(self.filters_scroll_frame, text=text, variable=var, onvalue="on", offvalue="off", command=cmd)
-                indent = 10 + (level * 20)
-                cb.pack(fill="x", padx=(10, indent), anchor="e")
-                self.filter_checkboxes[text] = cb
+        self.set_filter_items(filters_data)
+        self.show_filters_list(True)
+        self.apply_filter_search()
+
+    def set_filter_items(self, filters_data):
+        self.filter_items = filters_data
+        self.filter_index = NgramIndex()
+        self.filter_header_of, header = [], None
+        for i, item in enumerate(filters_data):
+            self.filter_index.add(item['text'] if item['level'] != -1 else "")
+            if item['level'] == -1: header = i
+            self.filter_header_of.append(header)
+        if not filters_data:
+            self.filters_list.set_items([])
+            self.show_filters_list(False)
+
+    def make_filter_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.var = ctk.StringVar(value="off")
+        row.header = ctk.CTkLabel(row, text="", font=self.title_font, anchor="e")
+        row.checkbox = ctk.CTkCheckBox(row, text="", variable=row.var, onvalue="on", offvalue="off",
+                                       command=lambda: self.on_filter_toggled(row.item['text'], row.var.get()))
+        row.kind = None
+        return row
+
+    def bind_filter_row(self, row, item):
+        row.item = item
+        kind = 'header' if item['level'] == -1 else 'filter'
+        if kind != row.kind:
+            (row.checkbox if kind == 'header' else row.header).pack_forget()
+            row.kind = kind
+        if kind == 'header':
+            row.header.configure(text=item['text'])
+            row.header.pack(fill="x", padx=5)
+        else:
+            row.var.set("on" if item['text'] in self.active_filters else "off")
+            row.checkbox.configure(text=item['text'])
+            row.checkbox.pack(fill="x", padx=(10, 10 + item['level'] * 20), anchor="e")
 
     def on_filter_toggled(self, name, state):
         if state == "on": self.active_filters.add(name)
         else: self.active_filters.discard(name)
         self.update_active_filters_display()
-        self.run_in_thread(self.scraper.apply_filter_by_name, self.on_initial_data_loaded, name)
+        # Toggles made in quick succession go to the site together, as one reload
+        if self.filter_apply_job: self.after_cancel(self.filter_apply_job)
+        self.filter_apply_job = self.after(FILTER_APPLY_DELAY_MS, self.apply_active_filters)
+
+    def apply_active_filters(self):
+        self.filter_apply_job = None
+        self.run_scraper('apply_filters', self.on_initial_data_loaded, frozenset(self.active_filters), kind='filter')
+
+    def reset_active_filters(self):
+        # A new page starts unfiltered on the site; a pending batch of toggles belonged to the old one
+        if self.filter_apply_job: self.after_cancel(self.filter_apply_job); self.filter_apply_job = None
+        self.active_filters.clear()
+        self.update_active_filters_display()
 
-    def filter_checkbox_list(self, event=None):
+    def schedule_filter_search(self, event=None):
+        if self.filter_search_job: self.after_cancel(self.filter_search_job)
+        self.filter_search_job = self.after(150, self.apply_filter_search)
+
+    def apply_filter_search(self):
+        self.filter_search_job = None
         term = self.filter_search_entry.get()
-        for name, cb in self.filter_checkboxes.items():
-            if term in name: cb.pack(fill="x", padx=cb.cget("padx"), anchor="e")
-            else: cb.pack_forget()
+        if not term.strip():
+            self.filters_list.set_items(self.filter_items); return
+        visible, last_header = [], None
+        for i in self.filter_index.search(term):
+            header = self.filter_header_of[i]
+            if header is not None and header != last_header:
+                visible.append(self.filter_items[header]); last_header = header
+            visible.append(self.filter_items[i])
+        self.filters_list.set_items(visible)
 
     def update_active_filters_display(self):
         for w in self.active_filters_frame.winfo_children(): w.destroy()
@@ -249,42 +565,71 @@ class App(ctk.CTk):
         else:
             self.active_filters_frame.grid_forget()
 
-    def start_download(self, shiur_id, title):
-        did = f"{shiur_id}_{int(time.time())}"
+    def start_download(self, shiur, state=None, show=True):
+        did = f"{shiur['id']}_{int(time.time())}"
+        if not self.scraper.queue_download(shiur, did, state): return
+        self.add_download_widget(did, shiur['title'])
+        if show: self.downloads_tab.master.set("הורדות")
+
+    def restore_downloads(self):
+        pending = self.scraper.unfinished_downloads()
+        for entry in pending:
+            self.start_download(entry['shiur'], entry.get('state'), show=False)
+        if pending: self.safe_update_status(f"שוחזרו {len(pending)} הורדות שלא הסתיימו")
+
+    def add_download_widget(self, did, title):
         frame = ctk.CTkFrame(self.downloads_scroll_frame); frame.pack(fill="x", padx=5, pady=2)
+        detail = ctk.CTkLabel(frame, text="", anchor="e", font=ctk.CTkFont(size=10), text_color="gray", height=14)
+        detail.pack(fill="x", side="bottom", padx=5)
         label_text = title[:35] + ("..." if len(title) > 35 else "")
         label = ctk.CTkLabel(frame, text=label_text, anchor="e")
         label.pack(fill="x", expand=True, side="right", padx=5)
         progress = ctk.CTkProgressBar(frame, orientation="horizontal", width=100)
         progress.pack(side="left", padx=5)
-        self.download_widgets[did] = {'progress': progress, 'label': label}
-        
-        self.scraper.queue_download(shiur_id, title, did)
-        self.downloads_tab.master.set("הורדות")
+        self.download_widgets[did] = {'progress': progress, 'label': label, 'detail': detail, 'determinate': False}
+
+    def update_download_totals(self):
+        totals = self.scraper.transfer_stats.totals()
+        if not totals['active']:
+            self.download_totals_label.configure(text=""); return
+        size = f"{format_bytes(totals['received'])}" + (f" / {format_bytes(totals['total'])}" if totals['total'] else "")
+        self.download_totals_label.configure(text=f"{totals['active']} פעילות · {size} · {format_bytes(totals['speed'])}/s")
 
-    def update_download_widget(self, did, prog, status):
+    def update_download_widget(self, did, prog, status, info=None):
         if did in self.download_widgets:
             widgets = self.download_widgets[did]
             if status == "starting":
                 widgets['progress'].configure(mode="indeterminate"); widgets['progress'].start()
+            elif status == "downloading" and info:
+                if info['total'] and not widgets['determinate']:
+                    widgets['progress'].stop(); widgets['progress'].configure(mode="determinate"); widgets['determinate'] = True
+                if widgets['determinate']: widgets['progress'].set(prog)
+                size = format_bytes(info['received']) + (f" / {format_bytes(info['total'])}" if info['total'] else "")
+                eta = f" · עוד {int(info['eta'])} ש'" if info['eta'] is not None else ""
+                widgets['detail'].configure(text=f"{size} · {format_bytes(info['speed'])}/s{eta}")
+            elif status == "retrying" and info:
+                widgets['progress'].stop()
+                widgets['detail'].configure(text=f"ניסיון {info['attempt']}/{info['max_attempts']} בעוד {info['delay']:.0f} ש' · {info['error'][:40]}")
             elif status == "completed":
+                widgets['detail'].configure(text="")
                 widgets['progress'].stop(); widgets['progress'].configure(mode="determinate", progress_color="green"); widgets['progress'].set(1)
                 widgets['label'].configure(text=f"✅ {widgets['label'].cget('text')}")
             elif status == "failed":
+                reason = "" if not info else ("שגיאה קבועה" if info['permanent'] else f"נכשל אחרי {info['attempts']} ניסיונות") + f" · {info['error'][:40]}"
+                widgets['detail'].configure(text=reason)
                 widgets['progress'].stop(); widgets['progress'].configure(mode="determinate", progress_color="red"); widgets['progress'].set(1)
                 widgets['label'].configure(text=f"❌ {widgets['label'].cget('text')}")
 
     def on_closing(self):
-        self.safe_update_status("סוגר..."); self.scraper.close_driver(); self.destroy()
+        self.safe_update_status("סוגר..."); self.closing = True
+        if self.scraper: self.scraper.close_driver()
+        elif self.shiur_index: self.shiur_index.close()
+        self.destroy()
 
 if __name__ == "__main__":
     setup_logging()
     logger.info(f"--- Application Starting on {platform.system()} ---")
-    driver = initial_login(print)
-    if driver:
-        app = App(driver=driver)
-        app.protocol("WM_DELETE_WINDOW", app.on_closing)
-        app.mainloop()
-    else:
-        print("ההתחברות נכשלה. התוכנה תיסגר.")
+    app = App()
+    app.protocol("WM_DELETE_WINDOW", app.on_closing)
+    app.mainloop()
     logger.info("--- Application Closed ---")
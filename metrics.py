@@ -0,0 +1,180 @@
+# metrics.py
+import os
+import json
+import time
+import bisect
+import logging
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, roughly logarithmic from 1ms to 2 minutes
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count, self.sum, self.max = 0, 0.0, 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1; self.sum += seconds
+        if seconds > self.max: self.max = seconds
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        target, seen = q * self.count, 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target and count: return bound if bound != float('inf') else self.max
+        return 0.0
+
+    def summary(self):
+        return {'count': self.count, 'sum': round(self.sum, 6), 'max': round(self.max, 6),
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99)}
+
+class Metrics:
+    # Process-wide latency histograms keyed by (name, labels) and gauges sampled at export time
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.gauges = {}
+        self.profile_hook = None
+        self.profiled = set()
+        self.profile_dir = None
+        self.profile_runs = 0
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None: hist = self.histograms[key] = Histogram()
+            hist.observe(seconds)
+        if self.profile_hook:
+            try: self.profile_hook(name, seconds, labels)
+            except Exception as e: logger.debug(f"Profile hook failed: {e}")
+
+    @contextmanager
+    def timer(self, name, **labels):
+        profiler = self._profiler_for(name)
+        start = time.perf_counter()
+        if profiler: profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler: profiler.disable()
+            self.observe(name, time.perf_counter() - start, **labels)
+            if profiler: self._dump_profile(name, profiler)
+
+    def gauge(self, name, sample):
+        # sample() is called at export time, so gauges cost nothing on the hot path
+        self.gauges[name] = sample
+
+    def set_profile_hook(self, hook):
+        # hook(name, seconds, labels) is called after every timed operation
+        self.profile_hook = hook
+
+    def profile_operations(self, names, directory):
+        # Runs the named operations under cProfile and writes one .prof file per call
+        self.profiled, self.profile_dir = set(names), directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _profiler_for(self, name):
+        return cProfile.Profile() if name in self.profiled else None
+
+    def _dump_profile(self, name, profiler):
+        with self.lock:
+            self.profile_runs += 1
+            run = self.profile_runs
+        path = os.path.join(self.profile_dir, f"{name}-{run}.prof")
+        try: profiler.dump_stats(path)
+        except OSError as e: logger.warning(f"Could not write profile {path}: {e}")
+
+    def snapshot(self):
+        with self.lock:
+            histograms = [{'name': name, 'labels': dict(labels), **hist.summary(), 'buckets': list(hist.counts)}
+                          for (name, labels), hist in sorted(self.histograms.items())]
+        gauges = {}
+        for name, sample in list(self.gauges.items()):
+            try: gauges[name] = sample()
+            except Exception as e: logger.debug(f"Gauge {name} failed: {e}")
+        return {'time': time.time(), 'buckets': list(BUCKETS), 'histograms': histograms, 'gauges': gauges}
+
+    def to_prometheus(self, prefix="kol"):
+        snap = self.snapshot()
+        lines, declared = [], set()
+        metric_name = lambda name: f"{prefix}_" + name.replace('.', '_').replace('-', '_')
+        label_text = lambda labels: ",".join(f'{k}="{str(v)}"' for k, v in labels.items())
+        for hist in snap['histograms']:
+            name = metric_name(hist['name']) + "_seconds"
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram"); declared.add(name)
+            labels, cumulative = label_text(hist['labels']), 0
+            sep = "," if labels else ""
+            for bound, count in zip(snap['buckets'] + ['+Inf'], hist['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {hist['sum']}")
+            lines.append(f"{name}_count{suffix} {hist['count']}")
+        for name, value in snap['gauges'].items():
+            lines.append(f"# TYPE {metric_name(name)} gauge")
+            lines.append(f"{metric_name(name)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        # Prometheus text for .prom/.txt files, JSON otherwise; written atomically for scrapers
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: f.write(text)
+        os.replace(tmp_path, path)
+
+    def export_periodically(self, path, interval=30):
+        def run():
+            while True:
+                time.sleep(interval)
+                try: self.export(path)
+                except Exception as e: logger.warning(f"Metrics export to {path} failed: {e}")
+        threading.Thread(target=run, daemon=True, name="metrics-export").start()
+
+metrics = Metrics()
+
+def timed(name=None):
+    def decorate(func):
+        op = name or func.__qualname__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(op): return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def instrument_methods(prefix, extra=()):
+    # Class decorator: times every public method, plus the named private ones
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if callable(value) and not isinstance(value, (staticmethod, classmethod, type)) and (not attr.startswith('_') or attr in extra):
+                setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+    return decorate
+
+class InstrumentedDriver:
+    # Wraps a WebDriver so every method call and property read (each a round trip) is timed by name
+    def __init__(self, driver):
+        object.__setattr__(self, '_driver', driver)
+
+    def __getattr__(self, attr):
+        start = time.perf_counter()
+        value = getattr(self._driver, attr)
+        if not callable(value):
+            metrics.observe("webdriver_call", time.perf_counter() - start, method=attr)
+            return value
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            with metrics.timer("webdriver_call", method=attr): return value(*args, **kwargs)
+        return call
+
+    def __setattr__(self, attr, value):
+        setattr(self._driver, attr, value)
@@ -0,0 +1,114 @@
+# page_prefetcher.py
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def state_key(state):
+    return (state['url'], tuple(state['filters']), state['page'])
+
+class PagePrefetcher:
+    # Loads the pages after the one being shown in a headless session of its own and keeps them in a small
+    # LRU. Pages are keyed by the same (url, filters, page) state the scraper tracks, and `following` links
+    # each state to the one its "next" button leads to, so URL-paged listings (ravs/<id>/<page>) work too.
+    # Only the latest schedule() counts: each call or cancel() bumps the generation and the worker drops
+    # whatever it was doing for an older one.
+    def __init__(self, open_session, restore, advance, depth=1, capacity=6):
+        self.open_session = open_session  # () -> driver
+        self.restore = restore            # (driver, state) -> None, leaves the driver on that page
+        self.advance = advance            # (driver) -> extracted page, or None on the last page
+        self.depth = depth
+        self.capacity = capacity
+        self.pages = OrderedDict()
+        self.following = {}
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.target = None
+        self.driver = None
+        self.at = None
+        self.closed = False
+        self.thread = None
+
+    def schedule(self, state):
+        with self.cond:
+            if self.closed or not state or not state.get('url'): return
+            self.generation += 1
+            self.target = dict(state, filters=list(state['filters']))
+            if not self.thread:
+                self.thread = threading.Thread(target=self._run, daemon=True, name="prefetch")
+                self.thread.start()
+            self.cond.notify_all()
+
+    def cancel(self):
+        with self.cond:
+            self.generation += 1
+            self.target = None
+
+    def take(self, state):
+        # The prefetched page after `state`, as (next_state, page), or None
+        with self.cond:
+            key = self.following.get(state_key(state))
+            page = self.pages.pop(key, None) if key else None
+            if page is None: return None
+            url, filters, number = key
+            return {'url': url, 'filters': list(filters), 'page': number}, page
+
+    def _store(self, previous, key, page):
+        self.following[previous] = key
+        self.pages[key] = page
+        self.pages.move_to_end(key)
+        while len(self.pages) > self.capacity:
+            old, _ = self.pages.popitem(last=False)
+            self.following = {k: v for k, v in self.following.items() if v != old}
+
+    def _plan(self):
+        # Walks the already-prefetched chain from the target; returns (generation, last known state, pages missing)
+        key, missing = state_key(self.target), self.depth
+        while missing and (nxt := self.following.get(key)) in self.pages:
+            key, missing = nxt, missing - 1
+        return self.generation, key, missing
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.closed and (not self.target or self._plan()[2] == 0): self.cond.wait()
+                if self.closed: return
+                generation, key, missing = self._plan()
+            try:
+                self._fetch(generation, key, missing)
+            except Exception as e:
+                logger.warning(f"Prefetch failed: {e}")
+                self.at = None
+                with self.cond:
+                    # Don't spin on a page that cannot be prefetched; the next schedule() tries again
+                    if self.generation == generation: self.target = None
+
+    def _fetch(self, generation, key, missing):
+        if not self.driver:
+            self.driver = self.open_session()
+            if not self.driver: raise RuntimeError("no browser session for prefetching")
+        if self.at != key:
+            url, filters, number = key
+            self.restore(self.driver, {'url': url, 'filters': list(filters), 'page': number})
+            self.at = key
+        for _ in range(missing):
+            if self.generation != generation: return
+            page = self.advance(self.driver)
+            if page is None:
+                with self.cond:
+                    if self.generation == generation: self.target = None
+                return
+            url, filters, number = self.at
+            key = (page['url'], filters, number + 1 if page['url'] == url else 0)
+            with self.cond:
+                self._store(self.at, key, page)
+            self.at = key
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.driver:
+            try: self.driver.quit()
+            except Exception as e: logger.warning(f"Failed to close prefetch session: {e}")
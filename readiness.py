@@ -0,0 +1,119 @@
+# readiness.py
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, JavascriptException
+
+logger = logging.getLogger(__name__)
+
+# Resolves once every Angular root reports no pending macrotasks (XHR, timers) - i.e. the app is idle.
+ANGULAR_STABLE_JS = """
+    const done = arguments[arguments.length - 1];
+    const testabilities = window.getAllAngularTestabilities ? window.getAllAngularTestabilities() : [];
+    if (!testabilities.length) { done(false); return; }
+    let pending = testabilities.length;
+    testabilities.forEach(t => t.whenStable(() => { if (--pending === 0) done(true); }));
+"""
+
+# Resolves after the subtree under arguments[0] has had no mutations for arguments[1] ms, or after arguments[2] ms.
+DOM_QUIET_JS = """
+    const done = arguments[arguments.length - 1];
+    const root = document.querySelector(arguments[0]) || document.body;
+    const quietMs = arguments[1], maxMs = arguments[2];
+    let quietTimer = null, finished = false;
+    const finish = settled => {
+        if (finished) return; finished = true;
+        observer.disconnect(); clearTimeout(quietTimer); clearTimeout(capTimer); done(settled);
+    };
+    const observer = new MutationObserver(() => { clearTimeout(quietTimer); quietTimer = setTimeout(() => finish(true), quietMs); });
+    observer.observe(root, { childList: true, subtree: true, characterData: true });
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    const capTimer = setTimeout(() => finish(false), maxMs);
+"""
+
+class AdaptiveTimeouts:
+    # Tracks each wait like a TCP RTT estimator: timeout = smoothed latency + 4 * deviation,
+    # bounded by a floor and by the caller's original fixed timeout. The estimate is only a first
+    # deadline - callers keep waiting up to the ceiling once it passes, and observe what the wait
+    # really took (timeouts included), so a site that slows down raises the estimate again.
+    def __init__(self, floor=1.0, alpha=0.125, beta=0.25):
+        self.floor, self.alpha, self.beta = floor, alpha, beta
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def get(self, name, ceiling):
+        with self.lock: stat = self.stats.get(name)
+        if not stat: return ceiling
+        mean, dev = stat
+        return min(ceiling, max(self.floor, mean + 4 * dev))
+
+    def observe(self, name, seconds):
+        with self.lock:
+            if name not in self.stats:
+                self.stats[name] = (seconds, seconds / 2)
+            else:
+                mean, dev = self.stats[name]
+                dev = (1 - self.beta) * dev + self.beta * abs(seconds - mean)
+                mean = (1 - self.alpha) * mean + self.alpha * seconds
+                self.stats[name] = (mean, dev)
+
+    @contextmanager
+    def measure(self, name):
+        start = time.monotonic()
+        try: yield
+        finally: self.observe(name, time.monotonic() - start)
+
+timeouts = AdaptiveTimeouts()
+
+def wait_until(driver, condition, name, ceiling, poll_frequency=0.1):
+    # Like WebDriverWait(...).until(), but learns how long `name` usually takes. Gives up only at `ceiling`.
+    start = time.monotonic()
+    first = timeouts.get(name, ceiling)
+    with timeouts.measure(name):
+        try:
+            return WebDriverWait(driver, first, poll_frequency=poll_frequency).until(condition)
+        except TimeoutException:
+            if first >= ceiling: raise
+            logger.debug(f"{name} is slower than its learned {first:.2f}s, waiting up to {ceiling}s")
+            return WebDriverWait(driver, ceiling - (time.monotonic() - start), poll_frequency=poll_frequency).until(condition)
+
+def wait_for_angular(driver, ceiling=10):
+    driver.set_script_timeout(timeouts.get('angular_stable', ceiling))
+    try:
+        with timeouts.measure('angular_stable'):
+            return driver.execute_async_script(ANGULAR_STABLE_JS)
+    except (TimeoutException, JavascriptException) as e:
+        logger.debug(f"Angular did not report stable: {e}")
+        return False
+
+def wait_for_dom_quiet(driver, selector, quiet_ms=100, ceiling=5):
+    max_ms = int(timeouts.get(f'dom_quiet:{selector}', ceiling) * 1000)
+    driver.set_script_timeout(max_ms / 1000 + 5)
+    with timeouts.measure(f'dom_quiet:{selector}'):
+        return driver.execute_async_script(DOM_QUIET_JS, selector, quiet_ms, max_ms)
+
+def wait_for_page_settled(driver, selector, ceiling=10):
+    if not wait_for_angular(driver, ceiling):
+        wait_for_dom_quiet(driver, selector, ceiling=ceiling)
+
+def wait_for_file_stable(path, timeout=15, plateau=0.2):
+    # Ready once the size has stopped changing for `plateau` seconds and the file can be opened
+    deadline = time.monotonic() + timeout
+    delay, last_size, stable_since = 0.02, -1, None
+    while time.monotonic() < deadline:
+        try:
+            size = os.path.getsize(path)
+            if size != last_size:
+                last_size, stable_since = size, time.monotonic()
+            elif time.monotonic() - stable_since >= plateau:
+                with open(path, 'rb') as f: f.read(1)
+                return True
+        except (IOError, PermissionError, FileNotFoundError):
+            stable_since = time.monotonic()
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+    return False
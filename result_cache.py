@@ -0,0 +1,51 @@
+# result_cache.py
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = Path.home() / '.kol_halashon' / 'cache.sqlite3'
+
+class ResultCache:
+    def __init__(self, path=CACHE_FILE, ttl=6 * 3600, max_entries=500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY, payload TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(url, filters=(), kind="results"):
+        return json.dumps([kind, url, sorted(filters)], ensure_ascii=False)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT payload, stored_at FROM results WHERE key = ?", (key,)).fetchone()
+            if not row: return None
+            if now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM results WHERE key = ?", (key,)); self.conn.commit()
+                return None
+            self.conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)); self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, payload):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO results (key, payload, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                              (key, json.dumps(payload, ensure_ascii=False), now, now))
+            self.conn.execute("""DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock: self.conn.close()
@@ -0,0 +1,45 @@
+# retry_policy.py
+import errno
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT, PERMANENT = 'transient', 'permanent'
+
+# By class name, so this module needs neither requests nor selenium
+TRANSIENT_ERRORS = {
+    'ConnectionError', 'Timeout', 'ConnectTimeout', 'ReadTimeout', 'ChunkedEncodingError', 'ContentDecodingError',
+    'IncompleteDownload', 'TimeoutException', 'StaleElementReferenceException', 'NoSuchElementException',
+    'WebDriverException', 'ElementClickInterceptedException', 'JavascriptException',
+}
+PERMANENT_ERRNOS = {errno.ENOSPC, errno.EROFS, errno.ENAMETOOLONG, errno.EDQUOT}
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class RetryPolicy:
+    # Exponential backoff with full jitter, capped in delay and in attempts. Attempts count from 1.
+    def __init__(self, max_attempts=5, base_delay=2.0, max_delay=120.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def classify(self, error):
+        # Server-side hiccups, dropped connections, slow pages and locked files are worth another try.
+        # Refusals (4xx), a full disk and plain bugs are not.
+        if isinstance(error, str): return TRANSIENT
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+        if status is not None: return TRANSIENT if status in TRANSIENT_STATUS else PERMANENT
+        for cls in type(error).__mro__:
+            if cls.__name__ in TRANSIENT_ERRORS: return TRANSIENT
+        if isinstance(error, OSError): return PERMANENT if error.errno in PERMANENT_ERRNOS else TRANSIENT
+        return PERMANENT
+
+    def delay(self, attempt):
+        # Seconds to wait after failed attempt number `attempt`
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def next_delay(self, error, attempt):
+        # The delay before another attempt, or None when the download should be given up
+        if attempt >= self.max_attempts or self.classify(error) == PERMANENT: return None
+        return self.delay(attempt)
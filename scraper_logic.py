@@ -7,63 +7,156 @@ from pathlib import Path
 import logging
 import configparser
 import os
-from tkinter import filedialog
-import tkinter as tk
+import platform
 import shutil
+import subprocess
 import threading
 import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, SessionNotCreatedException
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+from http_downloader import HttpDownloader, is_client_error, MEDIA_MIME_PREFIXES
+from result_cache import ResultCache
+from download_journal import DownloadJournal
+from library_index import LibraryIndex
+from transfer_stats import TransferStats, format_bytes
+from metrics import metrics, instrument_methods, InstrumentedDriver
+from driver_scheduler import DriverScheduler, Cancelled, FILTERS, DOWNLOAD, set_thread_priority, job_context, set_job_context
+from page_prefetcher import PagePrefetcher
+from shiur_index import ShiurIndex
+from retry_policy import RetryPolicy, PERMANENT
+from readiness import timeouts, wait_until, wait_for_file_stable
 
 logger = logging.getLogger(__name__)
 
 CODE_VALUE = "409573"
 PASSWORD_VALUE = "220106"
-RUN_HEADLESS = False
-TOPICS_FILE = Path("topics.json")
-LOGIN_URL = "https://www2.kolhalashon.com/#/login/%2FregularSite%2Fnew"
+RUN_HEADLESS = os.environ.get("KOL_HEADLESS") == "1"
+# Metrics go to this file (.prom/.txt for Prometheus text, JSON otherwise); KOL_PROFILE lists operations to cProfile
+METRICS_FILE = os.environ.get("KOL_METRICS_FILE")
+PROFILE_OPERATIONS = [op.strip() for op in os.environ.get("KOL_PROFILE", "").split(",") if op.strip()]
+DOWNLOAD_SESSIONS = 3
+DIRECT_DOWNLOADS = True
+HTTP_DOWNLOAD_WORKERS = 6
+BROWSER_DOWNLOAD_DEADLINE = 120  # seconds for Chrome to start writing a clicked download
+PREFETCH_PAGES = 1  # results pages loaded ahead in a headless session; 0 disables prefetching
+# KOL_SITE_URL points the scraper at another copy of the site, e.g. the benchmark stub
+SITE_URL = os.environ.get("KOL_SITE_URL", "https://www2.kolhalashon.com").rstrip("/")
+LOGIN_URL = f"{SITE_URL}/#/login/%2FregularSite%2Fnew"
+HOME_URL = f"{SITE_URL}/#/regularSite/new"
+LOGIN_FORM_SELECTOR = "input[formcontrolname='code']"
+LOGGED_IN_SELECTOR = ".banner-search input, .banner-title input"
 CONFIG_FILE = Path("config.ini")
+APP_DATA_DIR = Path.home() / '.kol_halashon'
+PROFILE_DIR = APP_DATA_DIR / 'chrome-profile'
+SESSION_FILE = APP_DATA_DIR / 'session.json'
 
-def _create_webdriver_standalone(status_callback):
-    status_callback("בודק הגדרות דרייבר...")
+def _read_config():
     config = configparser.ConfigParser()
-    service = None
-    if CONFIG_FILE.exists():
-        config.read(CONFIG_FILE)
-        if 'Paths' in config and 'driver_path' in config['Paths']:
-            saved_path = config['Paths']['driver_path']
-            if os.path.exists(saved_path):
-                status_callback("משתמש בנתיב דרייבר שמור.")
-                service = ChromeService(executable_path=saved_path)
-    if not service:
-        try:
-            status_callback("מנסה לאתר דרייבר אוטומטית...")
-            service = ChromeService(ChromeDriverManager().install())
-        except Exception as e:
-            status_callback("איתור אוטומטי נכשל. יש לבחור קובץ דרייבר ידנית.")
-            root = tk.Tk(); root.withdraw()
-            file_types = [("All files", "*.*")] if platform.system() == "Darwin" else [("Executable files", "*.exe")]
-            manual_path = filedialog.askopenfilename(title="אנא בחר את קובץ chromedriver", filetypes=file_types)
-            root.destroy()
-            if manual_path:
-                config['Paths'] = {'driver_path': manual_path}
-                with open(CONFIG_FILE, 'w') as configfile: config.write(configfile)
-                service = ChromeService(executable_path=manual_path)
-            else:
-                status_callback("לא נבחר דרייבר. לא ניתן להמשיך.")
-                return None
+    if CONFIG_FILE.exists(): config.read(CONFIG_FILE)
+    return config
+
+def _write_config_value(section, key, value):
+    config = _read_config()
+    if section not in config: config[section] = {}
+    if value is None: config[section].pop(key, None)
+    else: config[section][key] = value.replace('%', '%%')
+    with open(CONFIG_FILE, 'w') as configfile: config.write(configfile)
+
+def _installed_chrome_version():
+    # Local lookups only, so a cached driver can be validated without touching the network
+    try:
+        system = platform.system()
+        if system == "Windows":
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon") as key:
+                version = winreg.QueryValueEx(key, "version")[0]
+        elif system == "Darwin":
+            import plistlib
+            with open("/Applications/Google Chrome.app/Contents/Info.plist", 'rb') as f:
+                version = plistlib.load(f)["CFBundleShortVersionString"]
+        else:
+            binary = next(filter(None, map(shutil.which, ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"))), None)
+            if not binary: return None
+            version = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=5).stdout
+        m = re.search(r'(\d+)\.\d+', version)
+        return m.group(1) if m else None
+    except Exception as e:
+        logger.debug(f"Could not determine Chrome version: {e}")
+        return None
+
+_resolved_driver = {}
+DRIVER_DIALOG_TITLE = "אנא בחר את קובץ chromedriver"
+DRIVER_FILE_TYPES = [("All files", "*.*")] if platform.system() == "Darwin" else [("Executable files", "*.exe")]
+
+def _ask_driver_path():
+    # Only for callers without a Tk mainloop of their own (the CLI with a visible browser); the GUI passes
+    # a chooser that opens the dialog on its UI thread
+    import tkinter as tk
+    from tkinter import filedialog
+    root = tk.Tk(); root.withdraw()
+    path = filedialog.askopenfilename(title=DRIVER_DIALOG_TITLE, filetypes=DRIVER_FILE_TYPES)
+    root.destroy()
+    return path
+
+def _resolve_driver_path(status_callback, headless, choose_driver=None):
+    # Returns (path, from_cache). The path is remembered per process and in config.ini together with
+    # the Chrome major version it was resolved for; a Chrome update invalidates it.
+    if 'path' in _resolved_driver: return _resolved_driver['path'], True
+    config = _read_config()
+    paths = config['Paths'] if 'Paths' in config else {}
+    saved_path, saved_version = paths.get('driver_path'), paths.get('chrome_version')
+    chrome_version = _installed_chrome_version()
+    if saved_path and os.path.exists(saved_path):
+        if not saved_version or not chrome_version or saved_version == chrome_version:
+            status_callback("משתמש בנתיב דרייבר שמור.")
+            _resolved_driver['path'] = saved_path
+            return saved_path, True
+        logger.info(f"Chrome updated from {saved_version} to {chrome_version}, resolving a new driver.")
+    try:
+        status_callback("מנסה לאתר דרייבר אוטומטית...")
+        path = ChromeDriverManager().install()
+        _write_config_value('Paths', 'driver_path', path)
+        _write_config_value('Paths', 'chrome_version', chrome_version)
+    except Exception as e:
+        logger.error(f"Driver auto-detection failed: {e}")
+        status_callback("איתור אוטומטי נכשל. יש לבחור קובץ דרייבר ידנית.")
+        if headless:
+            status_callback("לא ניתן לבחור דרייבר ידנית במצב ללא ממשק.")
+            return None, False
+        path = (choose_driver or _ask_driver_path)()
+        if not path:
+            status_callback("לא נבחר דרייבר. לא ניתן להמשיך.")
+            return None, False
+        _write_config_value('Paths', 'driver_path', path)
+        _write_config_value('Paths', 'chrome_version', None)
+    _resolved_driver['path'] = path
+    return path, False
+
+def _create_webdriver_standalone(status_callback, headless=None, capture_network=False, profile_dir=None, choose_driver=None):
+    status_callback("בודק הגדרות דרייבר...")
+    headless = RUN_HEADLESS if headless is None else headless
+    driver_path, from_cache = _resolve_driver_path(status_callback, headless, choose_driver)
+    if not driver_path: return None
     status_callback("מפעיל את הדפדפן...")
     chrome_options = ChromeOptions()
-    if RUN_HEADLESS: chrome_options.add_argument("--headless=new")
+    if headless: chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
+    if profile_dir: chrome_options.add_argument(f"--user-data-dir={profile_dir}")
     temp_download_path = str(Path.home() / 'Downloads' / 'kol_halashon_temp')
     os.makedirs(temp_download_path, exist_ok=True)
     
@@ -72,72 +165,463 @@ def _create_webdriver_standalone(status_callback):
         "profile.default_content_setting_values.automatic_downloads": 1
     }
     chrome_options.add_experimental_option("prefs", prefs)
+    if capture_network: chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     
-    return webdriver.Chrome(service=service, options=chrome_options)
+    try:
+        return InstrumentedDriver(webdriver.Chrome(service=ChromeService(executable_path=driver_path), options=chrome_options))
+    except SessionNotCreatedException as e:
+        if from_cache:
+            # Usually a driver/browser version mismatch the version check could not see
+            logger.warning(f"Cached driver {driver_path} failed to start ({e.msg}), resolving again.")
+            _resolved_driver.clear()
+            _write_config_value('Paths', 'driver_path', None)
+            return _create_webdriver_standalone(status_callback, headless, capture_network, profile_dir, choose_driver)
+        if profile_dir:
+            # The profile may be locked by another running instance; the saved session still covers login
+            logger.warning(f"Could not start Chrome with profile {profile_dir} ({e.msg}), using a fresh profile.")
+            return _create_webdriver_standalone(status_callback, headless, capture_network, choose_driver=choose_driver)
+        raise
 
-def initial_login(status_callback):
-    driver = _create_webdriver_standalone(status_callback)
+def _apply_session(driver, cookies, storage):
+    # Copies a login (cookies + localStorage) into a driver; it must already be on SITE_URL
+    now = time.time()
+    for cookie in cookies:
+        if cookie.get('expiry') and cookie['expiry'] < now: continue
+        try: driver.add_cookie(cookie)
+        except Exception as e: logger.warning(f"Could not copy cookie {cookie.get('name')}: {e}")
+    driver.execute_script("""
+        const items = JSON.parse(arguments[0]);
+        for (const k in items) window.localStorage.setItem(k, items[k]);
+    """, storage)
+
+def _read_session(driver):
+    return driver.get_cookies(), driver.execute_script("return JSON.stringify(Object.assign({}, window.localStorage));")
+
+def _save_session(driver):
+    try:
+        cookies, storage = _read_session(driver)
+        SESSION_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SESSION_FILE.with_suffix('.tmp')
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'cookies': cookies, 'storage': storage}, f)
+        os.replace(tmp_path, SESSION_FILE)
+    except Exception as e:
+        logger.warning(f"Could not save browser session: {e}")
+
+def _resume_session(driver, status_callback, profile_existed):
+    # Reuses a login from the persistent profile or the saved session file, if it is still valid
+    saved = None
+    if SESSION_FILE.exists():
+        try:
+            with open(SESSION_FILE, 'r', encoding='utf-8') as f: saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable session file: {e}")
+    if not saved and not profile_existed: return False
+    status_callback("בודק התחברות קיימת...")
+    try:
+        if saved:
+            driver.get(SITE_URL)
+            _apply_session(driver, saved['cookies'], saved['storage'])
+        driver.get(HOME_URL)
+        state = wait_until(driver, lambda d: ('ready' if d.find_elements(By.CSS_SELECTOR, LOGGED_IN_SELECTOR)
+                                              else 'login' if '/login' in d.current_url or d.find_elements(By.CSS_SELECTOR, LOGIN_FORM_SELECTOR)
+                                              else False), 'session_check', 10)
+    except Exception as e:
+        logger.info(f"Saved session could not be checked: {e}")
+        return False
+    logger.info(f"Saved session is {'valid' if state == 'ready' else 'expired'}.")
+    return state == 'ready'
+
+def initial_login(status_callback, headless=None, choose_driver=None):
+    # choose_driver() returns a chromedriver path picked by the user, or None; called if auto-detection fails
+    headless = RUN_HEADLESS if headless is None else headless
+    # Headless runs (the CLI) may overlap a GUI that holds the profile, so they rely on the session file only
+    profile_dir = None if headless else PROFILE_DIR
+    profile_existed = bool(profile_dir) and profile_dir.exists()
+    driver = _create_webdriver_standalone(status_callback, headless, profile_dir=profile_dir, choose_driver=choose_driver)
     if not driver: return None
+    if _resume_session(driver, status_callback, profile_existed):
+        status_callback("✅ התחברות קיימת שוחזרה.")
+        _save_session(driver)
+        return driver
     status_callback("מתחיל תהליך התחברות...")
     driver.get(LOGIN_URL)
     try:
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, "input[formcontrolname='code']"))).send_keys(CODE_VALUE)
+        wait_until(driver, EC.visibility_of_element_located((By.CSS_SELECTOR, LOGIN_FORM_SELECTOR)), 'login_form', 10).send_keys(CODE_VALUE)
         password_input = driver.find_element(By.CSS_SELECTOR, "input[formcontrolname='password']")
         password_input.send_keys(PASSWORD_VALUE)
         password_input.send_keys(webdriver.common.keys.Keys.ENTER)
-        WebDriverWait(driver, 25).until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".banner-search input, .banner-title input")))
+        wait_until(driver, EC.visibility_of_element_located((By.CSS_SELECTOR, LOGGED_IN_SELECTOR)), 'login', 25)
         status_callback("✅ התחברות בוצעה בהצלחה.")
+        _save_session(driver)
         return driver
     except Exception as e:
         status_callback(f"❌ שגיאה: התחברות נכשלה. {e}")
         driver.quit()
         return None
 
+# Brings every filter checkbox to the wanted state in one pass: checked iff its label is in arguments[0].
+# Labels carry a shiurim count that changes as other filters apply, so they also match without it.
+SET_FILTERS_JS = """
+    const bare = text => text.replace(/\\s*\\(\\d+\\)\\s*$/, '').trim();
+    const wanted = new Map(arguments[0].map(name => [bare(name), name]));
+    const found = new Set(), toggled = [];
+    for (const cb of document.querySelectorAll('app-filter-container mat-checkbox')) {
+        const input = cb.querySelector('input');
+        if (!input) continue;
+        const label = Array.from(cb.querySelectorAll('.filter-title, .shiurim-count'))
+                           .map(el => el.textContent.trim()).join(' ').trim() || cb.textContent.trim();
+        const name = wanted.get(bare(label));
+        if (name !== undefined) found.add(name);
+        const checked = input.checked || cb.classList.contains('mat-checkbox-checked');
+        if (checked !== (name !== undefined)) { input.click(); toggled.push(label); }
+    }
+    return { toggled: toggled, missing: arguments[0].filter(name => !found.has(name)) };
+"""
+
+# Intercepts the site's download hand-off (anchor click / window.open) so the media URL can be
+# fetched directly instead of through Chrome's download manager.
+CAPTURE_DOWNLOAD_JS = """
+    if (!window.__khHooked) {
+        window.__khHooked = true;
+        window.__khOrigClick = HTMLAnchorElement.prototype.click;
+        HTMLAnchorElement.prototype.click = function() {
+            if (window.__khCapture && this.href) { window.__khCaptured.push(this.href); return; }
+            return window.__khOrigClick.call(this);
+        };
+        const origOpen = window.open;
+        window.open = function(u, ...rest) {
+            if (window.__khCapture && u) { window.__khCaptured.push(String(u)); return null; }
+            return origOpen.call(this, u, ...rest);
+        };
+    }
+    window.__khCaptured = [];
+    window.__khCapture = true;
+"""
+
+# One expansion round: open collapsed filter headers / "show more" / nested arrows, then resolve once
+# the filter panel has stopped mutating (or after maxMs), instead of sleeping a fixed time.
+EXPAND_FILTERS_ROUND_JS = """
+    const done = arguments[arguments.length - 1];
+    const quietMs = arguments[0], maxMs = arguments[1], openHeaders = arguments[2];
+    let quietTimer = null, capTimer = null, finished = false, mutations = 0;
+    const finish = clicked => {
+        if (finished) return; finished = true;
+        observer.disconnect(); clearTimeout(quietTimer); clearTimeout(capTimer);
+        done({ clicked, mutations });
+    };
+    const arm = () => { clearTimeout(quietTimer); quietTimer = setTimeout(() => finish(true), quietMs); };
+    const observer = new MutationObserver(records => { mutations += records.length; arm(); });
+    const root = document.querySelector('app-filter-container')?.parentElement || document.body;
+    observer.observe(root, { childList: true, subtree: true, attributes: true });
+    let clicked = false;
+    if (openHeaders) {
+        document.querySelectorAll('app-filter-container .filter-header').forEach(h => {
+            const c = h.closest('app-filter-container').querySelector('.filter-container');
+            if (c && !c.classList.contains('opened')) { h.click(); clicked = true; }
+        });
+    }
+    const showMoreButtons = Array.from(document.querySelectorAll(".display-more"))
+                                .filter(btn => btn.textContent.includes('הצג עוד') && btn.offsetParent);
+    if (showMoreButtons.length > 0) { showMoreButtons.forEach(btn => btn.click()); clicked = true; }
+    const closedArrowButtons = Array.from(document.querySelectorAll(".nested-filter-container:not(.expanded-nested-filter-container) .icon-nav-arrow, .scroll-container > .nested-filter-container:not(.expanded-nested-filter-container) .icon-nav-arrow"))
+                                   .filter(arrow => arrow.offsetParent);
+    if (closedArrowButtons.length > 0) { closedArrowButtons.forEach(arrow => arrow.click()); clicked = true; }
+    if (!clicked) { finish(false); return; }
+    arm();
+    capTimer = setTimeout(() => finish(true), maxMs);
+"""
+EXPAND_QUIET_MS = 150
+EXPAND_ROUND_MAX_MS = 3000
+
+# Everything the app needs from a results page, read in one pass. Shiurim are identified by the site's
+# file_id (the click-phone-button text); the position is kept only as a fallback.
+PAGE_DATA_JS = """
+    const text = (root, sel) => (root && root.querySelector(sel)?.textContent.trim()) || '';
+    const ravs = Array.from(document.querySelectorAll('.rav-container')).map((el, i) => ({
+        id: i, name: text(el, '.rav-name'), count: text(el, '.rav-shiurim-sum')
+    }));
+    const shiurim = Array.from(document.querySelectorAll('app-shiurim-display .shiur-container')).map((el, i) => {
+        const file_id = text(el, 'button.click-phone-button');
+        const date = text(el, '.shiurim-start-time');
+        const duration = text(el, '[class*="duration"], [class*="length"]')
+            || (el.textContent.replace(date, '').match(/\\b(?:\\d{1,2}:)?\\d{1,2}:\\d{2}\\b/) || [''])[0];
+        const link = el.querySelector('a[href][download], a[href*=".mp3"], a[href*=".mp4"]');
+        const button = el.querySelector('button svg-icon[src*="download-i.svg"]');
+        return {
+            id: file_id || `index:${i}`, index: i, file_id: file_id,
+            title: text(el, '.shiurim-title'), rav: text(el, '.shiurim-rav-name'), date: date, duration: duration,
+            download: link ? link.href : (button ? 'button' : '')
+        };
+    });
+    const pager = document.querySelector('app-pagination-options');
+    return {
+        url: location.href, ravs: ravs, shiurim: shiurim,
+        filter_categories: Array.from(document.querySelectorAll('app-filter-container .filter-header'))
+            .map(header => header.textContent.trim()).filter(Boolean),
+        filters_ready: !!document.querySelector('app-filter-container'),
+        pagination: {
+            has_next: !!(pager && pager.querySelector('.next:not(.disabled)')),
+            has_previous: !!(pager && pager.querySelector('.prev:not(.disabled), .previous:not(.disabled)')),
+            current: text(pager, '.active, .current')
+        }
+    };
+"""
+
+# Waits inside the page until results (or a rav list) are present, the DOM has been quiet for quietMs and
+# Angular reports stable, then returns PAGE_DATA_JS - one WebDriver round trip per page.
+PAGE_EXTRACT_JS = """
+    const done = arguments[arguments.length - 1];
+    const quietMs = arguments[0], maxMs = arguments[1];
+    const extract = () => {""" + PAGE_DATA_JS + """};
+    const ready = () => document.querySelector('.rav-container')
+        || (document.querySelector('app-shiurim-display .shiur-container') && document.querySelector('app-filter-container'));
+    let quietTimer = null, finished = false;
+    const finish = timedOut => {
+        if (finished) return; finished = true;
+        observer.disconnect(); clearTimeout(quietTimer); clearTimeout(capTimer);
+        const data = extract(); data.timed_out = timedOut; done(data);
+    };
+    const settle = () => {
+        const testabilities = window.getAllAngularTestabilities ? window.getAllAngularTestabilities() : [];
+        if (!testabilities.length) { finish(false); return; }
+        let pending = testabilities.length;
+        testabilities.forEach(t => t.whenStable(() => { if (--pending === 0) finish(false); }));
+    };
+    const arm = () => { clearTimeout(quietTimer); quietTimer = setTimeout(() => { if (ready()) settle(); }, quietMs); };
+    const observer = new MutationObserver(arm);
+    observer.observe(document.body, { childList: true, subtree: true });
+    const capTimer = setTimeout(() => finish(true), maxMs);
+    arm();
+"""
+PAGE_QUIET_MS = 100
+
+NEXT_PAGE_JS = """
+    const next = document.querySelector('app-pagination-options .next:not(.disabled)');
+    if (next) next.click();
+    return !!next;
+"""
+
+PARTIAL_DOWNLOAD_SUFFIXES = ('.crdownload', '.tmp')
+TEMP_POLL_INTERVAL = 0.5
+
+class _TempFolderEvents:
+    # watchdog only needs dispatch(); forwards every path that may hold a finished file
+    def __init__(self, paths_queue):
+        self.paths_queue = paths_queue
+
+    def dispatch(self, event):
+        if event.is_directory: return
+        if event.event_type in ('created', 'modified', 'closed'): self.paths_queue.put(event.src_path)
+        elif event.event_type == 'moved': self.paths_queue.put(event.dest_path)
+
+class DownloadSession:
+    def __init__(self, index, driver, lock=None, captures_network=False):
+        self.index = index
+        self.driver = driver
+        self.captures_network = captures_network
+        self.lock = lock or threading.Lock()
+        self.queue = queue.Queue()
+        self.page_state = None
+        self.thread = None
+
+    def load(self):
+        return self.queue.unfinished_tasks
+
+@instrument_methods("scraper", extra=('_handle_results_page', '_expand_and_get_all_filters', '_restore_page_state', '_initiate_browser_download'))
 class Scraper:
-    def __init__(self, driver, status_callback=None, download_progress_callback=None):
+    def __init__(self, driver, status_callback=None, download_progress_callback=None, results_callback=None, shiur_index=None):
         self.driver = driver
         self.status_callback = status_callback
         self.download_progress_callback = download_progress_callback
-        self.topics_data = None
+        self.results_callback = results_callback
         self.temp_download_path = str(Path.home() / 'Downloads' / 'kol_halashon_temp')
         self.final_download_path = str(Path.home())
-        self.driver_lock = threading.Lock()
+        # Every use of the interactive browser goes through the scheduler, which doubles as its lock
+        self.scheduler = DriverScheduler('driver_lock')
+        self.driver_lock = self.scheduler
+        try:
+            self.result_cache = ResultCache()
+        except Exception as e:
+            logger.error(f"Result cache unavailable: {e}")
+            self.result_cache = None
+
+        # Where the interactive browser currently is, so download sessions can reproduce it
+        self.applied_filters = set()
+        self.page_number = 0
+        self.page_state = None
+        self.prefetcher = PagePrefetcher(self._open_prefetch_session, self._restore_page_state,
+                                         self._advance_page, depth=PREFETCH_PAGES) if PREFETCH_PAGES else None
 
         self.download_queue = queue.Queue()
+        self.retry_policy = RetryPolicy()
+        try:
+            self.journal = DownloadJournal()
+        except Exception as e:
+            logger.error(f"Download journal unavailable: {e}")
+            self.journal = None
+        # Every shiur listed on a results page, searchable offline
+        try:
+            self.shiur_index = shiur_index or ShiurIndex()
+        except Exception as e:
+            logger.error(f"Shiur index unavailable: {e}")
+            self.shiur_index = None
         # --- NEW: The "message board" to link file IDs to download IDs ---
         self.active_downloads = {}
         self.monitor_lock = threading.Lock()
 
-        self.download_worker_thread = threading.Thread(target=self._download_worker, daemon=True)
+        # --- Download pool: N headless sessions, each with its own queue ---
+        self.download_sessions = []
+        self.download_pool_ready = threading.Event()
+        self.pool_lock = threading.Lock()
+
+        # --- Direct HTTP downloads, bypassing Chrome's download folder ---
+        self.libraries = {}
+        self.library_lock = threading.Lock()
+        self.http = HttpDownloader(HTTP_DOWNLOAD_WORKERS, store_file=self._store_file, refresh_cookies=self._browser_cookies) if DIRECT_DOWNLOADS else None
+        self.media_url_template = _read_config().get('Downloads', 'media_url_template', fallback=None)
+        self.media_headers = {}
+
+        self.download_dispatch_thread = threading.Thread(target=self._dispatch_downloads, daemon=True)
+        self.temp_events = queue.Queue()
+        self.transfer_stats = TransferStats()
+        self.partial_owner = {}
+        self.temp_activity = threading.Condition()
+        self.temp_activity_seq = 0
+        self.files_in_progress = set()
+        self.failed_files = set()
+        self.move_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="move")
         self.file_monitor_thread = threading.Thread(target=self._file_monitor, daemon=True)
-        self.download_worker_thread.start()
+        self.download_dispatch_thread.start()
         self.file_monitor_thread.start()
+        threading.Thread(target=self._start_download_pool, daemon=True).start()
+
+        metrics.gauge('download_queue', lambda: self.download_queue.qsize() + sum(s.queue.qsize() for s in self.download_sessions))
+        metrics.gauge('active_downloads', lambda: len(self.active_downloads))
+        metrics.gauge('active_transfers', lambda: self.transfer_stats.totals()['active'])
+        if self.prefetcher: metrics.gauge('prefetched_pages', lambda: len(self.prefetcher.pages))
+        if PROFILE_OPERATIONS: metrics.profile_operations(PROFILE_OPERATIONS, str(APP_DATA_DIR / 'profiles'))
+        if METRICS_FILE: metrics.export_periodically(METRICS_FILE)
 
     def set_final_download_path(self, path):
         target = os.path.join(path, "קול הלשון")
         os.makedirs(target, exist_ok=True)
         self.final_download_path = target
+        # Index the library up front so the first finished download doesn't pay for the scan
+        threading.Thread(target=self._library, args=(target,), daemon=True).start()
         self._update_status(f"ההורדות יישמרו ב: {self.final_download_path}")
 
     def _update_status(self, message):
         if self.status_callback: self.status_callback(message)
             
-    def _update_download_progress(self, did, prog, stat):
-        if self.download_progress_callback: self.download_progress_callback(did, prog, stat)
+    def _update_download_progress(self, did, prog, stat, info=None):
+        if self.download_progress_callback: self.download_progress_callback(did, prog, stat, info)
+
+    def _report_transfer(self, did, received, total=None):
+        if info := self.transfer_stats.update(did, received, total):
+            self._update_download_progress(did, received / total if total else 0, "downloading", info)
+
+    def _end_transfer(self, did):
+        with self.monitor_lock:
+            for fname in [f for f, d in self.partial_owner.items() if d == did]: del self.partial_owner[fname]
+        if summary := self.transfer_stats.finish(did):
+            metrics.observe('download_phase', summary['seconds'], phase='transfer')
+            logger.info(f"Transfer {did}: {format_bytes(summary['received'])} in {summary['seconds']:.1f}s ({format_bytes(summary['average_speed'])}/s)")
 
-    def _js_click(self, element):
-        self.driver.execute_script("arguments[0].click();", element)
+    def _js_click(self, element, driver=None):
+        (driver or self.driver).execute_script("arguments[0].click();", element)
+
+    def _start_download_pool(self):
+        set_thread_priority(DOWNLOAD)
+        try:
+            for i in range(DOWNLOAD_SESSIONS):
+                driver = self.open_session(f"download session {i+1}", capture_network=DIRECT_DOWNLOADS)
+                if not driver: break
+                self._add_download_session(DownloadSession(i + 1, driver, captures_network=DIRECT_DOWNLOADS))
+        except Exception as e:
+            logger.error(f"Failed to start download pool: {e}", exc_info=True)
+        if self.http:
+            with self.driver_lock:
+                self.http.load_browser_session(self.driver.get_cookies(), self.driver.execute_script("return navigator.userAgent;"))
+        if not self.download_sessions:
+            logger.warning("No download sessions available, downloading through the main browser.")
+            self._add_download_session(DownloadSession(0, self.driver, lock=self.driver_lock))
+        logger.info(f"Download pool ready with {len(self.download_sessions)} session(s).")
+        self.download_pool_ready.set()
+
+    def _browser_cookies(self):
+        # From a download session when there is one, so the interactive browser isn't held up
+        set_thread_priority(DOWNLOAD)
+        session = next((s for s in self.download_sessions if s.driver is not self.driver), None)
+        lock, driver = (session.lock, session.driver) if session else (self.driver_lock, self.driver)
+        with lock: return driver.get_cookies()
+
+    def _add_download_session(self, session):
+        session.thread = threading.Thread(target=self._download_worker, args=(session,), daemon=True)
+        self.download_sessions.append(session)
+        session.thread.start()
+
+    def open_session(self, label, capture_network=False):
+        # A headless browser logged in as the main one, for work that must not disturb the user's page
+        driver = _create_webdriver_standalone(lambda msg: logger.info(f"[{label}] {msg}"), headless=True, capture_network=capture_network)
+        if driver: self._share_login(driver)
+        return driver
+
+    def _open_prefetch_session(self):
+        # Runs on the prefetch thread; sharing the login must not hold up interactive work on the main browser
+        set_thread_priority(DOWNLOAD)
+        return self.open_session("prefetch session")
+
+    def _share_login(self, driver):
+        with self.driver_lock:
+            cookies, storage = _read_session(self.driver)
+        driver.get(SITE_URL)
+        _apply_session(driver, cookies, storage)
+        driver.refresh()
+
+    def _snapshot_page_state(self, url=None):
+        self.page_state = {'url': url or self.driver.current_url, 'filters': sorted(self.applied_filters), 'page': self.page_number}
+
+    def _reset_page_state(self):
+        self.applied_filters.clear()
+        self.page_number = 0
+        if self.prefetcher: self.prefetcher.cancel()
+
+    def _prefetch(self):
+        if self.prefetcher and self.page_state: self.prefetcher.schedule(self.page_state)
+
+    def _restore_page_state(self, driver, state, timeout=15):
+        shiur_selector = (By.CSS_SELECTOR, "app-shiurim-display .shiur-container")
+        driver.get(state['url'])
+        wait_until(driver, EC.presence_of_element_located(shiur_selector), 'results_page', timeout)
+        if state['filters']:
+            first_shiur = driver.find_element(*shiur_selector)
+            if self._set_filters(driver, state['filters']):
+                wait_until(driver, EC.staleness_of(first_shiur), 'filter_reload', timeout)
+                wait_until(driver, EC.presence_of_element_located(shiur_selector), 'results_page', timeout)
+        for _ in range(state['page']):
+            first_shiur = driver.find_element(*shiur_selector)
+            self._js_click(driver.find_element(By.CSS_SELECTOR, "app-pagination-options .next:not(.disabled)"), driver)
+            wait_until(driver, EC.staleness_of(first_shiur), 'page_change', timeout)
+            wait_until(driver, EC.presence_of_element_located(shiur_selector), 'results_page', timeout)
 
     def _wait_for_file_ready(self, path, timeout=15):
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'rb') as f: f.read(1)
-                    return True
-                except (IOError, PermissionError): time.sleep(0.5)
-            else: time.sleep(0.5)
-        return False
+        return wait_for_file_stable(path, timeout)
+
+    def _wait_for_download_start(self, seq_before, ceiling=3):
+        # Any event in the temp folder (a new .crdownload, a rename) means Chrome has taken the download
+        started, first = (lambda: self.temp_activity_seq > seq_before), timeouts.get('download_start', ceiling)
+        with self.temp_activity, timeouts.measure('download_start'):
+            if not self.temp_activity.wait_for(started, first) and first < ceiling:
+                self.temp_activity.wait_for(started, ceiling - first)
+
+    def _library(self, dest_dir):
+        with self.library_lock:
+            if dest_dir not in self.libraries: self.libraries[dest_dir] = LibraryIndex(dest_dir)
+            return self.libraries[dest_dir]
+
+    def _store_file(self, src_path, dest_dir, filename):
+        return self._library(dest_dir).store(src_path, filename)
 
     def _try_move_file(self, src_path, dest_dir, max_attempts=5, wait_timeout=20):
         if not self._wait_for_file_ready(src_path, timeout=wait_timeout):
@@ -146,70 +630,71 @@ class Scraper:
         filename = os.path.basename(src_path)
         for attempt in range(max_attempts):
             try:
-                name, ext = os.path.splitext(filename)
-                candidate = os.path.join(dest_dir, filename)
-                counter = 1
-                while os.path.exists(candidate):
-                    candidate = os.path.join(dest_dir, f"{name} ({counter}){ext}")
-                    counter += 1
-                shutil.move(src_path, candidate)
+                with metrics.timer('download_phase', phase='move'):
+                    candidate = self._store_file(src_path, dest_dir, filename)
                 logger.info(f"Successfully moved {src_path} to {candidate}")
                 return candidate
             except Exception as e:
                 logger.warning(f"Move attempt {attempt+1} failed for {src_path}: {e}")
-                time.sleep(1)
+                time.sleep(0.1 * 2 ** attempt)
         return None
 
-    def load_topics_from_file(self):
-        if self.topics_data: return self.topics_data
-        if not TOPICS_FILE.exists(): return None
-        with open(TOPICS_FILE, 'r', encoding='utf-8') as f:
-            self.topics_data = json.load(f)
-        return self.topics_data
+    @staticmethod
+    def _page_data(page):
+        return {'shiurim': page['shiurim'], 'filter_categories': page['filter_categories'], 'pagination': page['pagination']}
 
-    def get_initial_page_data(self):
-        self._update_status("טוען נתונים ראשוניים...")
-        try:
-            script = """
-            const shiurim = Array.from(document.querySelectorAll('app-shiurim-display .shiur-container')).map((el, i) => ({
-                id: i,
-                title: el.querySelector('.shiurim-title')?.textContent.trim() || '',
-                rav: el.querySelector('.shiurim-rav-name')?.textContent.trim() || '',
-                date: el.querySelector('.shiurim-start-time')?.textContent.trim() || ''
-            }));
-            const filter_categories = Array.from(document.querySelectorAll('app-filter-container .filter-header'))
-                .map(header => header.textContent.trim()).filter(Boolean);
-            return { shiurim, filter_categories };
-            """
-            return self.driver.execute_script(script)
-        except Exception as e:
-            logger.error(f"Failed to get initial page data: {e}")
-            return {'shiurim': [], 'filter_categories': []}
+    def _extract_page(self, ceiling=15, driver=None):
+        driver = driver or self.driver
+        first = timeouts.get('page_extract', ceiling)
+        driver.set_script_timeout(ceiling + 5)
+        start = time.monotonic()
+        with timeouts.measure('page_extract'):
+            page = driver.execute_async_script(PAGE_EXTRACT_JS, PAGE_QUIET_MS, int(first * 1000))
+            if page['timed_out'] and first < ceiling:
+                # Slower than learned, not necessarily broken: wait out the rest of the ceiling
+                remaining = ceiling - (time.monotonic() - start)
+                page = driver.execute_async_script(PAGE_EXTRACT_JS, PAGE_QUIET_MS, int(max(remaining, 0.1) * 1000))
+        return page
 
     def expand_and_get_all_filters(self):
+        key = self._filter_tree_key()
+        if key and self.result_cache and (cached := self.result_cache.get(key)) is not None:
+            self._update_status("טעינת המסננים הושלמה.")
+            return cached
+        # Waits behind any pending navigation, so the filters belong to the page being shown
+        with self.driver_lock.slot(FILTERS): filters_data = self._expand_and_get_all_filters()
+        if key and filters_data and self.result_cache: self.result_cache.put(key, filters_data)
+        return filters_data
+
+    def _filter_tree_key(self):
+        if not self.page_state: return None
+        return ResultCache.make_key(self.page_state['url'], self.page_state['filters'], kind="filters")
+
+    def _expand_filter_tree(self, driver, report=False):
+        for i in range(20):
+            # A navigation that superseded this job stops the expansion between rounds
+            self.scheduler.check()
+            if report: self._update_status(f"מרחיב מסננים... (שלב {i+1})")
+            driver.set_script_timeout(EXPAND_ROUND_MAX_MS / 1000 + 5)
+            round_result = driver.execute_async_script(EXPAND_FILTERS_ROUND_JS, EXPAND_QUIET_MS, EXPAND_ROUND_MAX_MS, i == 0)
+            if not round_result['clicked']: break
+
+    def _set_filters(self, driver, filters):
+        # One script call for the whole set, so N changed filters cost one reload. Returns whether anything changed.
+        filters = sorted(filters)
+        result = driver.execute_script(SET_FILTERS_JS, filters)
+        if result['missing']:
+            # Checkboxes hidden behind "show more" or a collapsed nested group only exist once expanded
+            self._expand_filter_tree(driver)
+            retry = driver.execute_script(SET_FILTERS_JS, filters)
+            result['toggled'] += retry['toggled']
+            if retry['missing']: logger.warning(f"Filters not found on the page: {retry['missing']}")
+        return bool(result['toggled'])
+
+    def _expand_and_get_all_filters(self):
         self._update_status("מרחיב מסננים ברקע...")
         try:
-            self.driver.execute_script("""
-                document.querySelectorAll('app-filter-container .filter-header').forEach(h => {
-                    const c = h.closest('app-filter-container').querySelector('.filter-container');
-                    if (c && !c.classList.contains('opened')) h.click();
-                });
-            """)
-            time.sleep(0.3)
-            for i in range(20):
-                self._update_status(f"מרחיב מסננים... (שלב {i+1})")
-                clicked_something = self.driver.execute_script("""
-                    let clicked = false;
-                    const showMoreButtons = Array.from(document.querySelectorAll(".display-more"))
-                                                .filter(btn => btn.textContent.includes('הצג עוד') && btn.offsetParent);
-                    if (showMoreButtons.length > 0) { showMoreButtons.forEach(btn => btn.click()); clicked = true; }
-                    const closedArrowButtons = Array.from(document.querySelectorAll(".nested-filter-container:not(.expanded-nested-filter-container) .icon-nav-arrow, .scroll-container > .nested-filter-container:not(.expanded-nested-filter-container) .icon-nav-arrow"))
-                                                   .filter(arrow => arrow.offsetParent);
-                    if (closedArrowButtons.length > 0) { closedArrowButtons.forEach(arrow => arrow.click()); clicked = true; }
-                    return clicked;
-                """)
-                if not clicked_something: break
-                time.sleep(0.8)
+            self._expand_filter_tree(self.driver, report=True)
             self._update_status("אוסף את רשימת המסננים...")
             filters_data = self.driver.execute_script("""
             function getElementText(el) {
@@ -244,39 +729,88 @@ class Scraper:
             """)
             self._update_status("טעינת המסננים הושלמה.")
             return filters_data
+        except Cancelled:
+            raise
         except Exception as e:
             self._update_status("שגיאה בטעינת המסננים.")
             logger.error(f"Failed to expand and get filters: {e}", exc_info=True)
             return []
 
-    def _handle_results_page(self):
+    def _handle_results_page(self, record_page=True):
+        # record_page: index the page and prefetch the next one; callers that do both themselves pass False
         self._update_status("ממתין לטעינת העמוד...")
         try:
-            WebDriverWait(self.driver, 15).until(EC.any_of(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "app-shiurim-display .shiur-container")),
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".rav-container"))
-            ))
-            time.sleep(1)
-            if self.driver.find_elements(By.CSS_SELECTOR, ".rav-container"):
-                return {'type': 'rav_selection', 'data': self.driver.execute_script("""
-                    return Array.from(document.querySelectorAll('.rav-container')).map((el, i) => ({
-                        id: i, name: el.querySelector('.rav-name')?.textContent.trim(),
-                        count: el.querySelector('.rav-shiurim-sum')?.textContent.trim()
-                    }));""")}
-            if self.driver.find_elements(By.CSS_SELECTOR, "app-shiurim-display .shiur-container"):
-                try:
-                    WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "app-filter-container")))
-                except TimeoutException:
-                    logger.warning("Filter container did not appear in time.")
-                return {'type': 'initial_data', 'data': self.get_initial_page_data()}
-            return {'type': 'error', 'message': 'לא נמצא תוכן מתאים.'}
+            page = self._extract_page()
         except TimeoutException:
             return {'type': 'error', 'message': 'העמוד לא נטען בזמן.'}
+        if page['ravs']:
+            return {'type': 'rav_selection', 'data': page['ravs']}
+        if page['shiurim']:
+            if not page['filters_ready']: logger.warning("Filter container did not appear in time.")
+            self._snapshot_page_state(page['url'])
+            if record_page:
+                self._index_page(page['shiurim'])
+                self._prefetch()
+            return {'type': 'initial_data', 'data': self._page_data(page)}
+        if page['timed_out']: return {'type': 'error', 'message': 'העמוד לא נטען בזמן.'}
+        return {'type': 'error', 'message': 'לא נמצא תוכן מתאים.'}
+
+    def _index_page(self, shiurim):
+        # Records the page's shiurim with the state that lists them, for browser downloads of local hits
+        if not self.shiur_index: return
+        try: self.shiur_index.add(shiurim, state=self.page_state)
+        except Exception as e: logger.warning(f"Could not index page: {e}")
+
+    def _current_cache_key(self):
+        if not self.page_state or self.page_number: return None
+        return ResultCache.make_key(self.page_state['url'], self.applied_filters)
+
+    def _store_result(self, key, result):
+        if not result or not key: return result
+        if self.result_cache and result.get('type') in ('initial_data', 'rav_selection'):
+            self.result_cache.put(key, result)
+        return dict(result, cache_key=key)
+
+    def _cached_or_load(self, key, url, navigate):
+        cached = self.result_cache.get(key) if self.result_cache and key else None
+        if cached:
+            # The lock is handed over to the revalidation thread, so the browser reaches this page
+            # before any other driver work (filters, paging) runs against it.
+            self.driver_lock.acquire()
+            self.page_state = {'url': url, 'filters': sorted(self.applied_filters), 'page': 0}
+            # The view this job was started for; a push after the user has moved on would replace a newer view
+            view = self.scheduler.token('view')
+            threading.Thread(target=self._revalidate, args=(key, navigate, cached, view, job_context()), daemon=True).start()
+            return dict(cached, cache_key=key, cached=True)
+        with self.driver_lock: navigate()
+        return self._store_result(key, self._handle_results_page())
+
+    def _revalidate(self, key, navigate, cached, view=None, context=None):
+        # Runs under the job's page token, so a navigation started after the cached hit supersedes it
+        # instead of waiting for a full load of a page the user has already left
+        if context: set_job_context(context)
+        result = None
+        try:
+            self.scheduler.check()
+            navigate()
+            self.scheduler.check()
+            result = self._handle_results_page()
+        except Cancelled:
+            logger.info(f"Revalidation of {key} superseded, skipped")
+        except Exception as e:
+            logger.warning(f"Revalidation failed for {key}: {e}")
+        finally:
+            self.driver_lock.release()
+        if not result or result.get('type') == 'error': return
+        fresh = self._store_result(key, result)
+        if fresh.get('data') != cached.get('data') and self.scheduler.is_current(view):
+            logger.info(f"Cached result changed, pushing fresh data for {key}")
+            if self.results_callback: self.results_callback(dict(fresh, view=view))
 
     def refresh_browser_page(self):
         self._update_status("מרענן את הדף...")
-        self.driver.refresh()
-        return self._handle_results_page()
+        with self.driver_lock: self.driver.refresh()
+        return self._store_result(self._current_cache_key(), self._handle_results_page())
 
     def refresh_current_page_content(self):
         self._update_status("טוען נתונים מחדש...")
@@ -285,13 +819,14 @@ class Scraper:
     def perform_search(self, query: str):
         self._update_status(f"חיפוש: '{query}'...")
         search_type = "ravSearch" if query.strip().startswith("הרב") else "searchResults"
-        self.driver.get(f"https://www2.kolhalashon.com/#/regularSite/{search_type}/{urllib.parse.quote(query)}")
-        return self._handle_results_page()
+        self._reset_page_state()
+        url = f"{SITE_URL}/#/regularSite/{search_type}/{urllib.parse.quote(query)}"
+        return self._cached_or_load(ResultCache.make_key(url), url, lambda: self.driver.get(url))
 
     def navigate_to_topic_by_href(self, href: str):
         self._update_status("מנווט לקטגוריה...")
-        self.driver.get(href)
-        return self._handle_results_page()
+        self._reset_page_state()
+        return self._cached_or_load(ResultCache.make_key(href), href, lambda: self.driver.get(href))
 
     def select_rav_from_results(self, rav_id: int):
         self._update_status("בוחר רב...")
@@ -299,122 +834,460 @@ class Scraper:
             rav_links = self.driver.find_elements(By.CSS_SELECTOR, ".rav-container a.rav-name")
             if rav_id < len(rav_links): self._js_click(rav_links[rav_id])
             else: return {'type': 'error', 'message': 'הרב לא נמצא.'}
+            self._reset_page_state()
         return self._handle_results_page()
 
     def apply_filter_by_name(self, filter_name: str):
-        self._update_status(f"מפעיל מסנן: {filter_name}...")
+        return self.apply_filters(self.applied_filters ^ {filter_name})
+
+    def apply_filters(self, filters, url=None):
+        # Makes `filters` the complete set of active filters on the current page (or on `url`, e.g. a saved
+        # page state), clicking every checkbox that differs in one script call and reloading once.
+        filters = set(filters)
+        if self.prefetcher: self.prefetcher.cancel()
+        self._update_status(f"מפעיל {len(filters)} מסננים..." if len(filters) != 1 else f"מפעיל מסנן: {next(iter(filters))}...")
+        target_url = url
+        def apply():
+            # Only a caller-supplied URL needs a fresh load; otherwise the checkboxes are toggled in place
+            if target_url: self._restore_page_state(self.driver, {'url': target_url, 'filters': sorted(filters), 'page': 0}, 20); return
+            first_shiur = self.driver.find_element(By.CSS_SELECTOR, "app-shiurim-display .shiur-container")
+            if self._set_filters(self.driver, filters):
+                wait_until(self.driver, EC.staleness_of(first_shiur), 'filter_reload', 20)
         try:
-            with self.driver_lock:
-                first_shiur = self.driver.find_element(By.CSS_SELECTOR, "app-shiurim-display .shiur-container")
-                self.driver.execute_script("""
-                    const filterText = arguments[0];
-                    for (const cb of document.querySelectorAll('mat-checkbox')) {
-                        const labelContent = Array.from(cb.querySelectorAll('.filter-title, .shiurim-count'))
-                                                  .map(el => el.textContent.trim()).join(' ').trim();
-                        if (labelContent === filterText || cb.textContent.trim() === filterText) {
-                            cb.querySelector('input').click(); return;
-                        }
-                    }
-                """, filter_name)
-                WebDriverWait(self.driver, 20).until(EC.staleness_of(first_shiur))
-            return self._handle_results_page()
+            url = url or (self.page_state['url'] if self.page_state else None)
+            self.applied_filters = filters
+            self.page_number = 0
+            key = ResultCache.make_key(url, self.applied_filters) if url else None
+            return self._cached_or_load(key, url, apply)
+        except Cancelled:
+            raise
         except Exception as e:
             return {'type': 'error', 'message': f'שגיאה בהפעלת המסנן: {e}'}
 
-    def queue_download(self, shiur_id, title, did):
-        self.download_queue.put({'shiur_id': shiur_id, 'title': title, 'did': did})
+    def queue_download(self, shiur, did, state=None):
+        # shiur is a record from the page data; its file_id is what the download is tracked by
+        state = state or self.page_state
+        file_id, title = shiur.get('file_id') or None, shiur['title']
+        if self.journal and file_id:
+            existing = self.journal.begin(file_id, {'shiur': shiur, 'state': state})
+            if existing:
+                self._update_status(f"כבר הורד: {title}" if existing == 'completed' else f"כבר בתור להורדה: {title}")
+                return False
+        self.download_queue.put({'shiur': shiur, 'file_id': file_id, 'title': title, 'did': did, 'state': state, 'queued_at': time.monotonic()})
         self._update_download_progress(did, 0, "starting")
+        return True
+
+    def unfinished_downloads(self):
+        # Downloads that were queued when the app last stopped, to be queued again on startup
+        return self.journal.unfinished() if self.journal else []
+
+    def _journal_result(self, file_id, path=None, error=None):
+        if not (self.journal and file_id): return
+        try:
+            if error is None: self.journal.complete(file_id, path)
+            else: self.journal.fail(file_id, error)
+        except Exception as e:
+            logger.warning(f"Could not journal result for {file_id}: {e}")
 
-    def _download_worker(self):
+    def _dispatch_downloads(self):
+        self.download_pool_ready.wait()
         while True:
             task = self.download_queue.get()
-            shiur_id, title, did = task['shiur_id'], task['title'], task['did']
+            with self.pool_lock:
+                session = min(self.download_sessions, key=lambda s: s.load())
+                session.queue.put(task)
+            self.download_queue.task_done()
+
+    def _find_shiur_element(self, driver, shiur):
+        # By file_id, or for shiurim without one, by position only if the title there still matches
+        element = driver.execute_script("""
+            const [fileId, index, title] = arguments;
+            const els = Array.from(document.querySelectorAll('app-shiurim-display .shiur-container'));
+            const textOf = (el, sel) => el.querySelector(sel)?.textContent.trim() || '';
+            if (fileId) return els.find(el => textOf(el, 'button.click-phone-button') === fileId) || null;
+            const el = els[index];
+            if (el && textOf(el, '.shiurim-title') === title) return el;
+            return els.find(el => textOf(el, '.shiurim-title') === title) || null;
+        """, shiur.get('file_id') or '', shiur.get('index', -1), shiur['title'])
+        if not element: raise LookupError(f"Shiur not found on page: {shiur['title']}")
+        return element
+
+    def _download_worker(self, session):
+        set_thread_priority(DOWNLOAD)
+        while True:
+            task = session.queue.get()
+            alive = True
+            title, did = task['title'], task['did']
+            metrics.observe('download_phase', time.monotonic() - task['queued_at'], phase='queue_wait')
             
             self._update_status(f"מתחיל הורדה: {title}")
             try:
-                with self.driver_lock:
-                    shiur_elements = self.driver.find_elements(By.CSS_SELECTOR, "app-shiurim-display .shiur-container")
-                    if shiur_id >= len(shiur_elements):
-                        raise IndexError("Shiur ID out of bounds")
-                    
-                    try:
-                        phone_button = shiur_elements[shiur_id].find_element(By.XPATH, ".//button[contains(@class, 'click-phone-button')]")
-                        file_id = phone_button.text.strip()
-                        if file_id:
-                            with self.monitor_lock:
-                                self.active_downloads[file_id] = did
-                                logger.info(f"Registered download: file_id {file_id} maps to did {did}")
-                    except NoSuchElementException:
-                        logger.warning(f"Could not find file_id for {title}. UI update will not work for this download.")
-
-                    download_button = shiur_elements[shiur_id].find_element(By.XPATH, ".//button[.//svg-icon[contains(@src, 'download-i.svg')]]")
-                    self._js_click(download_button)
-                    
-                    try:
-                        audio_option = WebDriverWait(self.driver, 5).until(EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'download-option')]")))
-                        self._js_click(audio_option)
-                    except TimeoutException:
-                        pass
-                    
-                    time.sleep(1.5) 
+                direct_link = task['shiur'].get('download', '')
+                if self.http and direct_link.startswith('http') and not task.get('via_browser'):
+                    self._start_http_download(task, direct_link, self.media_headers, guessed=True)
+                elif self.http and self.media_url_template and task.get('file_id') and not task.get('via_browser'):
+                    self._start_http_download(task, self.media_url_template.format(file_id=task['file_id']), self.media_headers, guessed=True, from_template=True)
+                else:
+                    self._initiate_browser_download(session, task)
             except Exception as e:
-                logger.error(f"Failed to initiate download for {title}: {e}")
-                self._update_download_progress(did, 0, "failed")
+                logger.error(f"Failed to initiate download for {title} (session {session.index}): {e}")
+                session.page_state = None
+                with self.monitor_lock:
+                    if task.get('file_id') and self.active_downloads.get(task['file_id']) == did: del self.active_downloads[task['file_id']]
+                alive = self._session_alive(session)
+                # A dead browser is not the shiur's fault: it goes back to the pool without using up an attempt
+                if alive: self._retry_or_fail(task, e)
+                else: self.download_queue.put(dict(task, queued_at=time.monotonic()))
             
-            self.download_queue.task_done()
-            time.sleep(1)
+            session.queue.task_done()
+            if not alive and not self._replace_session(session): return
+
+    def _session_alive(self, session):
+        if session.driver is self.driver: return True
+        try:
+            session.driver.current_url
+            return True
+        except Exception as e:
+            logger.warning(f"Download session {session.index} is not responding: {e}")
+            return False
+
+    def _replace_session(self, session):
+        # Reopens a crashed or expired download browser. If that fails the session leaves the pool and
+        # whatever was queued on it goes back to the dispatcher.
+        try: session.driver.quit()
+        except Exception: pass
+        try:
+            driver = self.open_session(f"download session {session.index}", capture_network=session.captures_network)
+        except Exception as e:
+            logger.error(f"Could not reopen download session {session.index}: {e}")
+            driver = None
+        if driver:
+            session.driver, session.page_state = driver, None
+            logger.info(f"Download session {session.index} replaced.")
+            return True
+        with self.pool_lock:
+            self.download_sessions = [s for s in self.download_sessions if s is not session]
+            if not self.download_sessions:
+                logger.warning("No download sessions left, downloading through the main browser.")
+                self._add_download_session(DownloadSession(0, self.driver, lock=self.driver_lock))
+            while True:
+                try: task = session.queue.get_nowait()
+                except queue.Empty: break
+                self.download_queue.put(task)
+                session.queue.task_done()
+        return False
+
+    def _retry_or_fail(self, task, error):
+        # Requeues the task after the policy's backoff, or records the failure once it gives up.
+        # Returns whether the task will be tried again.
+        did, title, attempt = task['did'], task['title'], task.get('attempt', 1)
+        delay = self.retry_policy.next_delay(error, attempt)
+        if delay is None:
+            permanent = self.retry_policy.classify(error) == PERMANENT
+            logger.error(f"Giving up on {title} after {attempt} attempt(s){' (permanent error)' if permanent else ''}: {error}")
+            self._journal_result(task.get('file_id'), error=error)
+            self._update_download_progress(did, 0, "failed", {'attempts': attempt, 'permanent': permanent, 'error': str(error)})
+            return False
+        logger.warning(f"Download of {title} failed (attempt {attempt}/{self.retry_policy.max_attempts}), retrying in {delay:.1f}s: {error}")
+        self._update_download_progress(did, 0, "retrying", {'attempt': attempt + 1, 'max_attempts': self.retry_policy.max_attempts,
+                                                             'delay': delay, 'error': str(error)})
+        retry = lambda: self.download_queue.put(dict(task, attempt=attempt + 1, queued_at=time.monotonic()))
+        timer = threading.Timer(delay, retry)
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def _initiate_browser_download(self, session, task):
+        driver, title, did = session.driver, task['title'], task['did']
+        file_id, media = task.get('file_id'), None
+        with session.lock:
+            if driver is not self.driver and task['state'] and session.page_state != task['state']:
+                self._restore_page_state(driver, task['state'])
+                session.page_state = task['state']
+            shiur_element = self._find_shiur_element(driver, task['shiur'])
+            if file_id:
+                with self.monitor_lock:
+                    self.active_downloads[file_id] = did
+                    logger.info(f"Registered download: file_id {file_id} maps to did {did} (session {session.index})")
+            else:
+                logger.warning(f"No file_id for {title}. UI update will not work for this download.")
+
+            if self.http and session.captures_network:
+                media = self._capture_media_request(driver, shiur_element)
+                # The transfer runs outside the browser, so it takes the cookies the browser just used
+                if media: self.http.load_browser_session(driver.get_cookies())
+            else:
+                with self.temp_activity: seq_before = self.temp_activity_seq
+                self._click_download(driver, shiur_element, started=lambda: self.temp_activity_seq > seq_before)
+                self._wait_for_download_start(seq_before)
+        # Nothing captured (or handed to Chrome as a blob) means Chrome owns this download on either branch
+        if not media and file_id: self._arm_download_deadline(task)
+        if media:
+            if file_id:
+                with self.monitor_lock: self.active_downloads.pop(file_id, None)
+            url, headers = media
+            self._learn_url_template(url, file_id, headers)
+            self._start_http_download(task, url, headers)
+
+    def _arm_download_deadline(self, task):
+        timer = threading.Timer(BROWSER_DOWNLOAD_DEADLINE, self._check_download_started, args=(task,))
+        timer.daemon = True
+        timer.start()
+
+    def _check_download_started(self, task):
+        # A click Chrome never acted on would otherwise keep its file_id registered forever
+        file_id, did = task['file_id'], task['did']
+        with self.monitor_lock:
+            if self.active_downloads.get(file_id) != did: return
+            writing = did in self.partial_owner.values()
+            if not writing: del self.active_downloads[file_id]
+        if writing:
+            self._arm_download_deadline(task); return
+        self._end_transfer(did)
+        self._retry_or_fail(task, TimeoutError(f"browser download did not start within {BROWSER_DOWNLOAD_DEADLINE}s"))
+
+    def _click_download(self, driver, shiur_element, started=None):
+        download_button = shiur_element.find_element(By.XPATH, ".//button[.//svg-icon[contains(@src, 'download-i.svg')]]")
+        self._js_click(download_button, driver)
+        
+        # Either the format menu shows up, or the download has already begun without it
+        # started() goes first: visibility_of_element_located raises NoSuchElementException while there is no menu
+        option_visible = EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'download-option')]"))
+        try:
+            audio_option = wait_until(driver, lambda d: (started and started() and 'started') or option_visible(d), 'download_option', 5)
+            if audio_option != 'started': self._js_click(audio_option, driver)
+        except TimeoutException:
+            pass
+
+    def _capture_media_request(self, driver, shiur_element):
+        driver.get_log('performance')
+        driver.execute_script(CAPTURE_DOWNLOAD_JS)
+        try:
+            self._click_download(driver, shiur_element, started=lambda: driver.execute_script("return window.__khCaptured.length > 0;"))
+            try:
+                captured = wait_until(driver, lambda d: d.execute_script("return window.__khCaptured.length ? window.__khCaptured : null;"), 'media_capture', 5)
+            except TimeoutException:
+                captured = None
+        finally:
+            driver.execute_script("window.__khCapture = false;")
+        if not captured:
+            # The site navigated to the file itself, so Chrome owns this download
+            return None
+        url, logged = captured[-1], self._media_requests_from_log(driver)
+        if url.startswith(('blob:', 'data:')):
+            if logged: return logged[-1]
+            driver.execute_script("const a = document.createElement('a'); a.href = arguments[0]; a.download = ''; window.__khOrigClick.call(a);", url)
+            return None
+        return url, next((h for u, h in logged if u == url), {})
+
+    def _media_requests_from_log(self, driver):
+        request_headers, media = {}, []
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                request_headers.setdefault(params['requestId'], {}).update(params['request'].get('headers', {}))
+            elif method == 'Network.requestWillBeSentExtraInfo':
+                request_headers.setdefault(params['requestId'], {}).update(params.get('headers', {}))
+            elif method == 'Network.responseReceived':
+                response = params['response']
+                disposition = {k.lower(): v for k, v in response.get('headers', {}).items()}.get('content-disposition', '')
+                if response.get('mimeType', '').startswith(MEDIA_MIME_PREFIXES) or 'attachment' in disposition:
+                    media.append((response['url'], request_headers.get(params['requestId'], {})))
+        return media
+
+    def _learn_url_template(self, url, file_id, headers):
+        self.media_headers = headers
+        if not file_id or len(file_id) < 4 or url.count(file_id) != 1: return
+        template = url.replace('{', '{{').replace('}', '}}').replace(file_id, '{file_id}')
+        if template != self.media_url_template:
+            self.media_url_template = template
+            _write_config_value('Downloads', 'media_url_template', template)
+            logger.info(f"Learned media URL template: {template}")
+
+    def _start_http_download(self, task, url, headers, guessed=False, from_template=False):
+        # guessed: the URL did not come from the site's own click, so a 4xx falls back to the browser
+        did, title, dest_dir = task['did'], task['title'], self.final_download_path
+        part_key = task.get('file_id') or url
+        def on_done(path, error):
+            self._end_transfer(did)
+            if path:
+                self._journal_result(task.get('file_id'), path)
+                self._update_download_progress(did, 1, "completed")
+            elif guessed and is_client_error(error):
+                logger.warning(f"Direct media URL rejected for {title} ({error}), falling back to the browser.")
+                if from_template: self.media_url_template = None
+                self.download_queue.put(dict(task, via_browser=True))
+            else:
+                # A retry finds the .part file and resumes with a Range request
+                logger.error(f"HTTP download failed for {title}: {error}")
+                if not self._retry_or_fail(task, error): self.http.discard_partial(dest_dir, part_key)
+        self.http.submit(url, dest_dir, title, on_done, headers,
+                         progress=lambda received, total: self._report_transfer(did, received, total), part_key=part_key)
 
     def _file_monitor(self):
-        processed_files = set()
+        os.makedirs(self.temp_download_path, exist_ok=True)
+        if Observer:
+            observer = Observer()
+            observer.schedule(_TempFolderEvents(self.temp_events), self.temp_download_path, recursive=False)
+            observer.daemon = True
+            observer.start()
+            logger.info(f"Watching {self.temp_download_path} for file events.")
+        else:
+            threading.Thread(target=self._poll_temp_folder, daemon=True).start()
+            logger.info(f"watchdog not installed, polling {self.temp_download_path} every {TEMP_POLL_INTERVAL}s.")
+        for fname in os.listdir(self.temp_download_path):
+            self.temp_events.put(os.path.join(self.temp_download_path, fname))
         while True:
+            path = self.temp_events.get()
+            with self.temp_activity:
+                self.temp_activity_seq += 1
+                self.temp_activity.notify_all()
             try:
-                all_files = set(os.listdir(self.temp_download_path))
-                completed_files = [f for f in all_files if not f.endswith(('.crdownload', '.tmp')) and f not in processed_files]
-
-                for fname in completed_files:
-                    full_path = os.path.join(self.temp_download_path, fname)
-                    processed_files.add(fname)
-                    
-                    did_to_update = None
-                    file_id_found = None
-                    with self.monitor_lock:
-                        for file_id, did in self.active_downloads.items():
-                            if file_id in fname:
-                                did_to_update = did
-                                file_id_found = file_id
-                                break
-                    
-                    if self._try_move_file(full_path, self.final_download_path):
-                        logger.info(f"Moved downloaded file: {fname}")
-                        if did_to_update:
-                            self._update_download_progress(did_to_update, 1, "completed")
-                            with self.monitor_lock:
-                                del self.active_downloads[file_id_found]
-                    else:
-                        logger.error(f"Failed to move {fname} from temp folder.")
-                        if did_to_update:
-                            self._update_download_progress(did_to_update, 0, "failed")
-                            with self.monitor_lock:
-                                del self.active_downloads[file_id_found]
-                
-                if len(processed_files) > 100:
-                    processed_files.clear()
-
+                self._on_temp_file(path)
             except Exception as e:
                 logger.error(f"Error in file monitor: {e}")
-            
-            time.sleep(2)
+
+    def _poll_temp_folder(self):
+        known = {}
+        while True:
+            try:
+                current = {e.name: e.stat().st_size for e in os.scandir(self.temp_download_path) if e.is_file()}
+                for fname, size in current.items():
+                    if known.get(fname) != size: self.temp_events.put(os.path.join(self.temp_download_path, fname))
+                known = current
+            except Exception as e:
+                logger.error(f"Error polling temp folder: {e}")
+            time.sleep(TEMP_POLL_INTERVAL)
+
+    def _match_download(self, fname):
+        # Chrome names files after the shiur, and the site's file_id appears in the name
+        with self.monitor_lock:
+            for token in re.findall(r'\d+', fname) + [os.path.splitext(fname)[0]]:
+                if token in self.active_downloads: return token, self.active_downloads.pop(token)
+        return None, None
+
+    def _on_partial_file(self, path, fname):
+        # Chrome grows <name>.crdownload while downloading; bytes are reported only for a file whose name
+        # carries the file_id of an active download, since guessing would show them on the wrong row
+        with self.monitor_lock:
+            did = self.partial_owner.get(fname)
+            if did is None:
+                did = next((self.active_downloads[t] for t in re.findall(r'\d+', fname) if t in self.active_downloads), None)
+                if did is None: return
+                self.partial_owner[fname] = did
+        try: size = os.path.getsize(path)
+        except OSError: return
+        self._report_transfer(did, size)
+
+    def _on_temp_file(self, path):
+        fname = os.path.basename(path)
+        if fname.endswith('.crdownload'):
+            self._on_partial_file(path, fname); return
+        if fname.endswith(PARTIAL_DOWNLOAD_SUFFIXES) or fname.startswith('.') or not os.path.isfile(path): return
+        try: key = (fname, os.stat(path).st_mtime_ns)
+        except OSError: return
+        with self.monitor_lock:
+            if fname in self.files_in_progress or key in self.failed_files: return
+            self.files_in_progress.add(fname)
+        self.move_executor.submit(self._finish_temp_file, path, key)
+
+    def _finish_temp_file(self, path, key, match=None, attempt=1):
+        fname, retrying = key[0], False
+        try:
+            file_id, did = match or self._match_download(fname)
+            if did and not match: self._end_transfer(did)
+            destination = self._try_move_file(path, self.final_download_path)
+            if destination:
+                logger.info(f"Moved downloaded file: {fname}")
+                self._journal_result(file_id, destination)
+                if did: self._update_download_progress(did, 1, "completed")
+            elif (delay := self.retry_policy.next_delay("move failed", attempt)) is not None:
+                # The file is complete in the temp folder, so only the move is retried; fname stays
+                # in files_in_progress meanwhile so the monitor doesn't pick it up again
+                logger.warning(f"Could not move {fname} yet (attempt {attempt}), retrying in {delay:.1f}s")
+                if did: self._update_download_progress(did, 1, "retrying", {'attempt': attempt + 1, 'max_attempts': self.retry_policy.max_attempts,
+                                                                            'delay': delay, 'error': "move failed"})
+                timer = threading.Timer(delay, self._retry_move, args=(path, key, (file_id, did), attempt + 1))
+                timer.daemon = True
+                timer.start()
+                retrying = True
+            else:
+                logger.error(f"Failed to move {fname} from temp folder.")
+                with self.monitor_lock: self.failed_files.add(key)
+                self._journal_result(file_id, error="move failed")
+                if did: self._update_download_progress(did, 0, "failed", {'attempts': attempt, 'permanent': False, 'error': "move failed"})
+        finally:
+            if not retrying:
+                with self.monitor_lock: self.files_in_progress.discard(fname)
+
+    def _retry_move(self, path, key, match, attempt):
+        try: self.move_executor.submit(self._finish_temp_file, path, key, match, attempt)
+        except RuntimeError: logger.info(f"Shutting down, not retrying the move of {key[0]}")
 
     def navigate_to_next_page(self):
         try:
             self._update_status("עובר לעמוד הבא...")
+            if self.prefetcher and self.page_state and (hit := self.prefetcher.take(self.page_state)):
+                return self._show_prefetched(*hit)
+            url_before = self.page_state['url'] if self.page_state else None
             with self.driver_lock:
-                next_button = self.driver.find_element(By.CSS_SELECTOR, "app-pagination-options .next:not(.disabled)")
-                self._js_click(next_button)
-            return self._handle_results_page()
+                if not self.driver.execute_script(NEXT_PAGE_JS): raise NoSuchElementException("no next page")
+            result = self._handle_results_page(record_page=False)
+            if result.get('type') != 'initial_data': return result
+            # Some listings (e.g. ravs/<id>/<page>) carry the page in the URL itself
+            if self.page_state['url'] == url_before: self.page_number += 1
+            else: self.page_number = 0
+            self._snapshot_page_state(self.page_state['url'])
+            self._index_page(result['data']['shiurim'])
+            self._prefetch()
+            return result
         except NoSuchElementException:
             self._update_status("אין עמוד הבא.")
             return None
 
+    def _advance_page(self, driver):
+        # Clicks "next" and extracts the page it leads to; None on the last page
+        first_shiur = driver.find_element(By.CSS_SELECTOR, "app-shiurim-display .shiur-container")
+        if not driver.execute_script(NEXT_PAGE_JS): return None
+        wait_until(driver, EC.staleness_of(first_shiur), 'page_change', 20)
+        page = self._extract_page(driver=driver)
+        return page if page['shiurim'] else None
+
+    def _show_prefetched(self, state, page):
+        # The page is shown right away; the lock is handed to a thread that moves the browser there too,
+        # so later driver work (filters, downloads of this page's state) waits until it has arrived.
+        self.driver_lock.acquire()
+        self.page_state, self.page_number = state, state['page']
+        threading.Thread(target=self._follow_prefetched, args=(page,), daemon=True).start()
+        self._index_page(page['shiurim'])
+        self._prefetch()
+        return {'type': 'initial_data', 'data': self._page_data(page), 'prefetched': True}
+
+    def _follow_prefetched(self, page):
+        try:
+            live = self._advance_page(self.driver)
+            if not live or [s['file_id'] for s in live['shiurim']] != [s['file_id'] for s in page['shiurim']]:
+                logger.info(f"Prefetched page differs from the live one at {self.page_state}")
+        except Exception as e:
+            logger.warning(f"Browser could not follow to the prefetched page: {e}")
+        finally:
+            self.driver_lock.release()
+
     def close_driver(self):
-        if self.driver: self.driver.quit()
+        if self.prefetcher: self.prefetcher.close()
+        if self.http: self.http.close()
+        self.move_executor.shutdown(wait=False, cancel_futures=True)
+        if self.result_cache: self.result_cache.close()
+        if METRICS_FILE:
+            try: metrics.export(METRICS_FILE)
+            except OSError as e: logger.warning(f"Could not write metrics to {METRICS_FILE}: {e}")
+        if self.journal: self.journal.close()
+        if self.shiur_index: self.shiur_index.close()
+        for session in self.download_sessions:
+            if session.driver is not self.driver:
+                try: session.driver.quit()
+                except Exception as e: logger.warning(f"Failed to close download session {session.index}: {e}")
+        if self.driver:
+            _save_session(self.driver)
+            self.driver.quit()
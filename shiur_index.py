@@ -0,0 +1,95 @@
+# shiur_index.py
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+from hebrew_text import normalize, prefix_variants
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = Path.home() / '.kol_halashon' / 'shiurim.sqlite3'
+
+def search_local(index, query, limit=100):
+    # A results page answered from the index alone, shaped like the scraper's, so it works before (or
+    # without) a browser; hits can go straight to queue_download
+    if not index: return {'type': 'error', 'message': 'האינדקס המקומי אינו זמין.'}
+    return {'type': 'initial_data', 'data': {'shiurim': index.search(query, limit), 'filter_categories': [], 'pagination': {}}, 'local': True}
+
+class ShiurIndex:
+    # Every shiur seen on a results page, keyed by the site's file_id, with an FTS5 index over normalized
+    # title, rav and date. Words are also indexed without their one-letter prefixes, so "בראשית" finds
+    # "ובבראשית". Without FTS5 in the local SQLite build, search falls back to LIKE over the same columns.
+    def __init__(self, path=INDEX_FILE):
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS shiurim (
+            id INTEGER PRIMARY KEY, file_id TEXT UNIQUE NOT NULL, record TEXT NOT NULL, search_text TEXT NOT NULL, seen_at REAL NOT NULL)""")
+        try:
+            self.conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS shiurim_fts USING fts5(
+                title, rav, date, stems, tokenize="unicode61 remove_diacritics 2")""")
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite has no FTS5 ({e}), local search falls back to LIKE.")
+            self.fts = False
+        self.conn.commit()
+
+    @staticmethod
+    def _columns(shiur):
+        title, rav, date = (normalize(shiur.get(k) or '') for k in ('title', 'rav', 'date'))
+        stems = " ".join(v for word in f"{title} {rav}".split() for v in prefix_variants(word))
+        return title, rav, date, stems
+
+    def add(self, shiurim, state=None, source=None):
+        # Upserts a page of shiurim in one transaction. Records without a file_id are positional and skipped.
+        now, added = time.time(), 0
+        with self.lock:
+            for shiur in shiurim:
+                file_id = shiur.get('file_id')
+                if not file_id: continue
+                record = {k: shiur.get(k) or '' for k in ('file_id', 'title', 'rav', 'date', 'duration')}
+                if shiur.get('download'): record['download'] = shiur['download']
+                if state: record['state'] = state
+                if source or shiur.get('source'): record['source'] = source or shiur['source']
+                columns = self._columns(shiur)
+                row = self.conn.execute("SELECT id FROM shiurim WHERE file_id = ?", (file_id,)).fetchone()
+                if row:
+                    self.conn.execute("UPDATE shiurim SET record = ?, search_text = ?, seen_at = ? WHERE id = ?",
+                                      (json.dumps(record, ensure_ascii=False), " ".join(columns), now, row[0]))
+                    if self.fts: self.conn.execute("DELETE FROM shiurim_fts WHERE rowid = ?", (row[0],))
+                    rowid = row[0]
+                else:
+                    rowid = self.conn.execute("INSERT INTO shiurim (file_id, record, search_text, seen_at) VALUES (?, ?, ?, ?)",
+                                              (file_id, json.dumps(record, ensure_ascii=False), " ".join(columns), now)).lastrowid
+                    added += 1
+                if self.fts: self.conn.execute("INSERT INTO shiurim_fts (rowid, title, rav, date, stems) VALUES (?, ?, ?, ?, ?)", (rowid, *columns))
+            self.conn.commit()
+        return added
+
+    def search(self, query, limit=100):
+        # Every query word must match, as a prefix of an indexed word. Returns records, best first,
+        # with 'id' set to the file_id so they can go straight to queue_download.
+        words = [w.replace('"', '') for w in normalize(query).split()]
+        words = [w for w in words if w]
+        if not words: return []
+        with self.lock:
+            if self.fts:
+                match = " ".join(f'"{w}"*' for w in words)
+                rows = self.conn.execute("""SELECT s.record FROM shiurim_fts JOIN shiurim s ON s.id = shiurim_fts.rowid
+                    WHERE shiurim_fts MATCH ? ORDER BY bm25(shiurim_fts, 10.0, 5.0, 1.0, 2.0), s.seen_at DESC LIMIT ?""", (match, limit)).fetchall()
+            else:
+                where = " AND ".join("search_text LIKE ?" for _ in words)
+                rows = self.conn.execute(f"SELECT record FROM shiurim WHERE {where} ORDER BY seen_at DESC LIMIT ?",
+                                         (*[f"%{w}%" for w in words], limit)).fetchall()
+        return [dict(record, id=record['file_id']) for record in map(json.loads, (r[0] for r in rows))]
+
+    def __len__(self):
+        with self.lock: return self.conn.execute("SELECT COUNT(*) FROM shiurim").fetchone()[0]
+
+    def close(self):
+        with self.lock: self.conn.close()
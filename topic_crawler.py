@@ -0,0 +1,88 @@
+# topic_crawler.py
+import re
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from readiness import wait_for_page_settled
+
+logger = logging.getLogger(__name__)
+
+# Topic pages link to their sibling topics; a category is identified by the searchResults/<id>/ prefix
+DISCOVER_TOPICS_JS = """
+    const prefix = arguments[0], seen = new Set(), found = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        const name = a.textContent.trim();
+        if (!name || !a.href.startsWith(prefix) || seen.has(a.href)) continue;
+        seen.add(a.href); found.push({ name: name, href: a.href });
+    }
+    return found;
+"""
+CATEGORY_PREFIX_RE = re.compile(r'^(.*#/regularSite/searchResults/\d+/)')
+
+class TopicCrawler:
+    # Re-crawls the category tree in parallel headless sessions. Each category is merged into the
+    # catalog and topics.json is rewritten as soon as it finishes, so an interrupted refresh keeps its progress.
+    def __init__(self, scraper, catalog, sessions=3, progress_callback=None):
+        self.scraper = scraper
+        self.catalog = catalog
+        self.sessions = sessions
+        self.progress_callback = progress_callback
+        self.drivers = queue.Queue()
+        self.opened = []
+        self.lock = threading.Lock()
+
+    def _jobs(self):
+        jobs = []
+        for main_cat in self.catalog.categories():
+            prefixes = {}
+            for _, _, href in self.catalog.topics_in(main_cat):
+                if m := CATEGORY_PREFIX_RE.match(href): prefixes.setdefault(m.group(1), href)
+            if prefixes: jobs.append((main_cat, prefixes))
+            else: logger.info(f"Skipping category {main_cat}: its topics are not searchResults pages")
+        return jobs
+
+    def _driver(self):
+        try: return self.drivers.get_nowait()
+        except queue.Empty: pass
+        driver = self.scraper.open_session(f"topics session {len(self.opened) + 1}")
+        if not driver: raise RuntimeError("Could not open a browser session for the topic crawl")
+        with self.lock: self.opened.append(driver)
+        return driver
+
+    def _crawl(self, prefixes):
+        driver = self._driver()
+        try:
+            found = []
+            for prefix, href in prefixes.items():
+                driver.get(href)
+                wait_for_page_settled(driver, "body", 15)
+                found += driver.execute_script(DISCOVER_TOPICS_JS, prefix)
+            return found
+        finally:
+            self.drivers.put(driver)
+
+    def refresh(self):
+        jobs = self._jobs()
+        done, changed = 0, 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix="topics") as pool:
+                futures = {pool.submit(self._crawl, prefixes): main_cat for main_cat, prefixes in jobs}
+                for future in as_completed(futures):
+                    main_cat, done = futures[future], done + 1
+                    try:
+                        found = future.result()
+                    except Exception as e:
+                        logger.error(f"Crawling category {main_cat} failed: {e}")
+                        found = []
+                    if found and (changes := self.catalog.merge(main_cat, found)):
+                        self.catalog.save()
+                        changed += changes
+                        logger.info(f"Category {main_cat}: {changes} topics added or renamed")
+                    if self.progress_callback: self.progress_callback(done, len(jobs), main_cat)
+        finally:
+            for driver in self.opened:
+                try: driver.quit()
+                except Exception as e: logger.warning(f"Failed to close topics session: {e}")
+        return changed
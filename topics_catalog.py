@@ -0,0 +1,84 @@
+# topics_catalog.py
+import os
+import json
+import threading
+from pathlib import Path
+
+from hebrew_text import NgramIndex
+
+TOPICS_FILE = Path("topics.json")
+
+def load_topics(path=TOPICS_FILE):
+    # Plain file read with no selenium import, so the GUI can build its menus before the browser exists
+    if not path.exists(): return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class TopicCatalog:
+    # topics.json flattened into (category, name, href) tuples. Categories map to slices of that list,
+    # hrefs to positions, and an n-gram index over "name category" serves fuzzy search.
+    def __init__(self, topics=None, path=TOPICS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self._build(topics or {})
+
+    @classmethod
+    def load(cls, path=TOPICS_FILE):
+        return cls(load_topics(path), path)
+
+    def _build(self, topics):
+        entries, ranges = [], {}
+        for main_cat, sub_cats in topics.items():
+            start = len(entries)
+            entries.extend((main_cat, sub['name'], sub['href']) for sub in sub_cats)
+            ranges[main_cat] = (start, len(entries))
+        self.entries, self.ranges = entries, ranges
+        self.by_href = {href: i for i, (_, _, href) in enumerate(entries)}
+        self.index = NgramIndex(f"{name} {main_cat}" for main_cat, name, _ in entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def categories(self):
+        return list(self.ranges)
+
+    def topics_in(self, main_cat):
+        start, end = self.ranges.get(main_cat, (0, 0))
+        return self.entries[start:end]
+
+    def search(self, query, limit=20):
+        return [self.entries[i] for i in self.index.fuzzy(query, limit)]
+
+    def find(self, name):
+        # "category/topic" or just "topic", matched exactly
+        main_name, _, sub_name = name.rpartition('/')
+        for main_cat, sub, href in self.entries:
+            if sub == sub_name and (not main_name or main_cat == main_name): return href
+        return None
+
+    def to_dict(self):
+        return {main_cat: [{'name': name, 'href': href} for _, name, href in self.topics_in(main_cat)] for main_cat in self.ranges}
+
+    def merge(self, main_cat, found):
+        # Renames known hrefs and appends new ones; topics missing from a crawl are kept, since the
+        # site's menus can render lazily. Returns the number of changes.
+        with self.lock:
+            topics = self.to_dict()
+            subs = topics.setdefault(main_cat, [])
+            positions = {sub['href']: i for i, sub in enumerate(subs)}
+            changes = 0
+            for item in found:
+                i = positions.get(item['href'])
+                if i is None:
+                    positions[item['href']] = len(subs); subs.append({'name': item['name'], 'href': item['href']}); changes += 1
+                elif subs[i]['name'] != item['name']:
+                    subs[i]['name'] = item['name']; changes += 1
+            if changes: self._build(topics)
+            return changes
+
+    def save(self):
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,51 @@
+# transfer_stats.py
+import time
+import threading
+
+class TransferStats:
+    # Per-download byte counters with a smoothed throughput, so the UI can show speed/ETA and totals
+    def __init__(self, alpha=0.3, min_interval=0.25):
+        self.alpha, self.min_interval = alpha, min_interval
+        self.transfers = {}
+        self.lock = threading.Lock()
+
+    def update(self, did, received, total=None, force=False):
+        now = time.monotonic()
+        with self.lock:
+            t = self.transfers.get(did)
+            if t is None:
+                t = self.transfers[did] = {'started': now, 'last_time': now, 'last_bytes': received, 'speed': 0.0, 'received': received, 'total': total}
+            elif not force and now - t['last_time'] < self.min_interval:
+                t['received'], t['total'] = received, total or t['total']
+                return None
+            else:
+                elapsed = now - t['last_time']
+                if elapsed > 0:
+                    instant = (received - t['last_bytes']) / elapsed
+                    t['speed'] = instant if not t['speed'] else self.alpha * instant + (1 - self.alpha) * t['speed']
+                t['last_time'], t['last_bytes'] = now, received
+                t['received'], t['total'] = received, total or t['total']
+            return self._info(t)
+
+    def _info(self, t):
+        eta = (t['total'] - t['received']) / t['speed'] if t['total'] and t['speed'] > 0 else None
+        return {'received': t['received'], 'total': t['total'], 'speed': t['speed'], 'eta': eta}
+
+    def finish(self, did):
+        with self.lock:
+            t = self.transfers.pop(did, None)
+        if not t: return None
+        elapsed = time.monotonic() - t['started']
+        return {'received': t['received'], 'seconds': elapsed, 'average_speed': t['received'] / elapsed if elapsed > 0 else 0.0}
+
+    def totals(self):
+        with self.lock:
+            return {'active': len(self.transfers),
+                    'received': sum(t['received'] for t in self.transfers.values()),
+                    'total': sum(t['total'] or 0 for t in self.transfers.values()),
+                    'speed': sum(t['speed'] for t in self.transfers.values())}
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB": return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
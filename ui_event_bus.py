@@ -0,0 +1,22 @@
+# ui_event_bus.py
+import threading
+
+class UIEventBus:
+    # Backend threads publish here instead of scheduling a Tk callback per message. The UI drains it
+    # once per frame; only the latest status and the latest progress per download survive.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = None
+        self.progress = {}
+
+    def publish_status(self, message):
+        with self.lock: self.status = message
+
+    def publish_progress(self, did, *update):
+        with self.lock: self.progress[did] = update
+
+    def drain(self):
+        with self.lock:
+            status, progress = self.status, self.progress
+            self.status, self.progress = None, {}
+        return status, progress
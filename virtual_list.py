@@ -0,0 +1,88 @@
+# virtual_list.py
+import math
+import platform
+import tkinter as tk
+import customtkinter as ctk
+
+class VirtualList(ctk.CTkFrame):
+    # Fixed-height rows drawn on a canvas. Only enough row widgets to fill the viewport are created;
+    # scrolling re-binds them to other items instead of creating or destroying widgets.
+    def __init__(self, master, row_height, make_row, bind_row, label_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.make_row, self.bind_row = make_row, bind_row
+        self.row_height = int(self._apply_widget_scaling(row_height))
+        self.items = []
+        self.rows = []
+        self.top = 0
+        self.grid_columnconfigure(0, weight=1); self.grid_rowconfigure(1, weight=1)
+        if label_text: ctk.CTkLabel(self, text=label_text).grid(row=0, column=0, columnspan=2, sticky="ew")
+        bg = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkFrame"]["fg_color"])
+        self.canvas = tk.Canvas(self, highlightthickness=0, borderwidth=0, bg=bg)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.canvas.bind("<Configure>", lambda e: self._render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_wheel, add="+")
+
+    def set_items(self, items):
+        self.items = list(items)
+        self.top = 0
+        for row in self.rows: row.bound_item = None
+        self._render()
+
+    def _max_top(self):
+        return max(0, len(self.items) * self.row_height - self.canvas.winfo_height())
+
+    def scroll_to(self, top):
+        top = min(max(0, int(top)), self._max_top())
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _render(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if height <= 1: return
+        needed = min(len(self.items), math.ceil(height / self.row_height) + 1)
+        while len(self.rows) < needed:
+            row = self.make_row(self.canvas)
+            row.bound_item = None
+            row.window = self.canvas.create_window(0, 0, window=row, anchor="nw", height=self.row_height)
+            self.rows.append(row)
+        first = self.top // self.row_height
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if i < needed and index < len(self.items):
+                item = self.items[index]
+                if row.bound_item is not item:
+                    self.bind_row(row, item)
+                    row.bound_item = item
+                self.canvas.coords(row.window, 0, index * self.row_height - self.top)
+                self.canvas.itemconfigure(row.window, width=width, state="normal")
+            else:
+                self.canvas.itemconfigure(row.window, state="hidden")
+        total = len(self.items) * self.row_height
+        if total <= height: self.scrollbar.set(0, 1)
+        else: self.scrollbar.set(self.top / total, (self.top + height) / total)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.items) * self.row_height)
+        elif action == "scroll":
+            step = self.canvas.winfo_height() if unit == "pages" else self.row_height
+            self.scroll_to(self.top + int(value) * step)
+
+    def _contains(self, widget):
+        while widget is not None:
+            if widget is self: return True
+            widget = widget.master
+        return False
+
+    def _on_wheel(self, event):
+        try: target = self.winfo_containing(event.x_root, event.y_root)
+        except (KeyError, tk.TclError): return
+        if not self._contains(target): return
+        if event.num == 4: delta = -1
+        elif event.num == 5: delta = 1
+        else: delta = -event.delta / (1 if platform.system() == "Darwin" else 120)
+        self.scroll_to(self.top + delta * self.row_height)